@@ -4,26 +4,39 @@ Aspen Snowmass Official Scraper
 Hits the official JSON endpoints directly for 100% accuracy
 """
 
+import json
+import time
 import pandas as pd
-import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
 from datetime import datetime
+from http_session import get_session
+from snapshots import ASPEN_FEED, load_snapshot, save_snapshot
+from log_setup import PER_ITEM, setup_logging
+from run_report import in_current_span
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("aspen_scraper.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# The pooled session asks for HTML by default; these feeds are JSON, and some
+# CDNs answer an HTML Accept header with an HTML page
+JSON_HEADERS = {'Accept': 'application/json'}
+
+# Feed requests are retried here rather than by the session's urllib3 Retry,
+# so no attempt or backoff sleep runs past the shared deadline
+FEED_ATTEMPTS = 3
+FEED_RETRY_BACKOFF = 1.0
+FEED_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
 class AspenSnowmassScraper:
     """Scrapes snow conditions from official aspensnowmass.com JSON feeds"""
     
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, replay_dir=None, timeout=15, deadline=25):
+        # Read saved feed snapshots from this directory instead of the network
+        self.replay_dir = replay_dir
+        # Per-request timeout, and the overall budget shared by all feeds
+        self.timeout = timeout
+        self.deadline = deadline
         self.base_url = "https://www.aspensnowmass.com/AspenSnowmass/SnowReport/Feed"
         self.mountains = {
             'Snowmass': 'Snowmass',
@@ -33,50 +46,110 @@ class AspenSnowmassScraper:
         }
     
     def scrape(self):
-        """Fetch data from the 4 individual mountain feeds"""
-        results = []
+        """Fetch the 4 individual mountain feeds concurrently"""
+        results = {}
+        deadline = time.monotonic() + self.deadline
+        
+        executor = ThreadPoolExecutor(max_workers=len(self.mountains), thread_name_prefix='aspen-feed')
+        futures = {
+            executor.submit(in_current_span(self._fetch_feed), display_name, internal_id, deadline): display_name
+            for display_name, internal_id in self.mountains.items()
+        }
+        try:
+            for future in as_completed(futures, timeout=self.deadline):
+                display_name = futures[future]
+                try:
+                    data = future.result()
+                    if data is None:
+                        continue
+                    results[display_name] = self._parse_feed(display_name, data)
+                except Exception as e:
+                    logger.error(f"Error processing {display_name}: {e}")
+        except FuturesTimeout:
+            missing = [name for future, name in futures.items() if not future.done()]
+            logger.error(f"Aspen feeds missed the {self.deadline}s deadline: {', '.join(missing)}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        # Keep the mountains in their usual order
+        return pd.DataFrame([results[name] for name in self.mountains if name in results])
+
+    def _parse_feed(self, display_name, data):
+        """Turn one mountain feed into a resort row"""
+        # Extract values from the JSON structure
+        # Note: The keys match the screenshot exactly (snow24Hours, snowBase, etc.)
+        resort = {
+            'name': display_name,
+            'status': data.get('status', 'Unknown'),
+            'new_snow_24h': int(data.get('snow24Hours', {}).get('inches', 0)),
+            'new_snow_48h': int(data.get('snow48Hours', {}).get('inches', 0)),
+            'base_depth': int(data.get('snowBase', {}).get('inches', 0)),
+            'open_lifts': int(data.get('lifts', {}).get('openCount', 0)),
+            'total_lifts': int(data.get('lifts', {}).get('totalCount', 0)),
+            'open_trails': int(data.get('trails', {}).get('openCount', 0)),
+            'total_trails': int(data.get('trails', {}).get('totalCount', 0)),
+            'source': 'Aspen Official',
+            'data_fetched_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
         
-        for display_name, internal_id in self.mountains.items():
+        # Create the string format fields for downstream compatibility
+        resort['lifts_open'] = f"{resort['open_lifts']}/{resort['total_lifts']}"
+        resort['trails_open'] = f"{resort['open_trails']}/{resort['total_trails']}"
+        
+        logger.info(f"✅ Success {display_name}: {resort['new_snow_24h']}\" new, {resort['base_depth']}\" base, {resort['lifts_open']} lifts", extra=PER_ITEM)
+        return resort
+
+    def _get_before(self, url, deadline=None):
+        """GET with retries, each attempt and backoff capped at the time left
+
+        Returns the last response, or None if the deadline passed first.
+        """
+        import requests
+
+        response = None
+        for attempt in range(FEED_ATTEMPTS):
+            timeout = self.timeout
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    return response
+            last = attempt == FEED_ATTEMPTS - 1
             try:
-                url = f"{self.base_url}?mountain={internal_id}"
-                logger.info(f"Fetching official data for {display_name}...")
-                
-                response = requests.get(url, timeout=15)
-                if response.status_code != 200:
-                    logger.error(f"Failed to fetch {display_name}: Status {response.status_code}")
-                    continue
-                
-                data = response.json()
-                
-                # Extract values from the JSON structure
-                # Note: The keys match the screenshot exactly (snow24Hours, snowBase, etc.)
-                resort = {
-                    'name': display_name,
-                    'status': data.get('status', 'Unknown'),
-                    'new_snow_24h': int(data.get('snow24Hours', {}).get('inches', 0)),
-                    'new_snow_48h': int(data.get('snow48Hours', {}).get('inches', 0)),
-                    'base_depth': int(data.get('snowBase', {}).get('inches', 0)),
-                    'open_lifts': int(data.get('lifts', {}).get('openCount', 0)),
-                    'total_lifts': int(data.get('lifts', {}).get('totalCount', 0)),
-                    'open_trails': int(data.get('trails', {}).get('openCount', 0)),
-                    'total_trails': int(data.get('trails', {}).get('totalCount', 0)),
-                    'source': 'Aspen Official',
-                    'data_fetched_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                # Create the string format fields for downstream compatibility
-                resort['lifts_open'] = f"{resort['open_lifts']}/{resort['total_lifts']}"
-                resort['trails_open'] = f"{resort['open_trails']}/{resort['total_trails']}"
-                
-                results.append(resort)
-                logger.info(f"✅ Success {display_name}: {resort['new_snow_24h']}\" new, {resort['base_depth']}\" base, {resort['lifts_open']} lifts")
-                
-            except Exception as e:
-                logger.error(f"Error processing {display_name}: {e}")
+                response = get_session(retries=False).get(url, headers=JSON_HEADERS, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if last or deadline is not None and time.monotonic() >= deadline:
+                    raise
+            else:
+                if last or response.status_code not in FEED_RETRY_STATUSES:
+                    return response
+            backoff = FEED_RETRY_BACKOFF * 2 ** attempt
+            if deadline is not None:
+                backoff = min(backoff, deadline - time.monotonic())
+            time.sleep(max(0, backoff))
+        return response
+
+    def _fetch_feed(self, display_name, internal_id, deadline=None):
+        """Fetch (or replay) one mountain feed; returns parsed JSON or None"""
+        snapshot_name = ASPEN_FEED.format(mountain=internal_id)
+        if self.replay_dir:
+            return json.loads(load_snapshot(self.replay_dir, snapshot_name))
+
+        url = f"{self.base_url}?mountain={internal_id}"
+        logger.info(f"Fetching official data for {display_name}...", extra=PER_ITEM)
+        
+        response = self._get_before(url, deadline)
+        if response is None:
+            logger.error(f"Failed to fetch {display_name}: missed the {self.deadline}s deadline")
+            return None
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch {display_name}: Status {response.status_code}")
+            return None
         
-        return pd.DataFrame(results)
+        save_snapshot(snapshot_name, response.text)
+        return response.json()
 
 if __name__ == "__main__":
+    setup_logging("aspen_scraper.log")
     scraper = AspenSnowmassScraper()
     df = scraper.scrape()
     print("\nVERIFIED DATA:")
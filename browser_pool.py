@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Shared Chrome Browser Pool
+Starts one Chrome instance on first use and hands out tabs to the scrapers,
+so a combined run pays browser startup (and memory) once instead of per source
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from log_setup import PER_ITEM
+from run_report import add_usage, span
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+# Network-level resource blocking (set BLOCK_RESOURCES=false for an unblocked
+# baseline run to compare the per-page byte/time figures against)
+BLOCK_RESOURCES = os.environ.get('BLOCK_RESOURCES', 'true').lower() == 'true'
+
+# Never needed by any scraper: media, fonts, stylesheets, analytics and ads
+BASE_BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.mp4', '*.webm', '*.css',
+    '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*adservice.google.com*', '*amazon-adsystem.com*',
+    '*facebook.net*', '*hotjar.com*', '*scorecardresearch.com*', '*quantserve.com*',
+    '*cookielaw.org*', '*onetrust.com*', '*adnxs.com*', '*taboola.com*', '*outbrain.com*',
+]
+
+# Seconds shutdown() waits for an outstanding tab lease before quitting
+# Chrome anyway, so a hung page load can't block cleanup
+SHUTDOWN_TIMEOUT = float(os.environ.get('BROWSER_SHUTDOWN_TIMEOUT', '30'))
+
+# Per-page load figures collected by collect_page_stats()
+PAGE_LOAD_STATS = []
+_stats_lock = threading.Lock()
+
+_PAGE_STATS_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0] || {};
+const res = performance.getEntriesByType('resource');
+let bytes = nav.transferSize || 0;
+for (const r of res) { bytes += r.transferSize || 0; }
+return {
+    bytes: bytes,
+    requests: res.length + 1,
+    load_ms: Math.round(nav.loadEventEnd || nav.domContentLoadedEventEnd || performance.now())
+};
+"""
+
+
+def build_chrome_options(headless=True):
+    """Chrome options shared by every scraper"""
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+
+    if headless:
+        chrome_options.add_argument("--headless")
+
+    # Essential options for CI/cloud environments
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+    return chrome_options
+
+
+def apply_resource_blocking(driver, blocked_urls):
+    """Block the given URL patterns for subsequent loads in the current tab"""
+    if not BLOCK_RESOURCES:
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(blocked_urls)})
+    except Exception as e:
+        logger.warning(f"Could not enable resource blocking: {e}")
+
+
+def wait_until_ready(driver, predicate, timeout=30, poll_frequency=0.25):
+    """Poll a readiness predicate via WebDriverWait; returns seconds to ready
+
+    Raises selenium's TimeoutException if the deadline passes first.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    started = time.monotonic()
+    WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(predicate)
+    elapsed = time.monotonic() - started
+    logger.info(f"Page ready after {elapsed:.2f}s", extra=PER_ITEM)
+    return elapsed
+
+
+def collect_page_stats(driver, url, time_to_ready=None):
+    """Record bytes transferred, request count and load time for the loaded page"""
+    try:
+        stats = driver.execute_script(_PAGE_STATS_SCRIPT)
+    except Exception as e:
+        logger.warning(f"Could not read page load stats for {url}: {e}")
+        return None
+
+    stats['url'] = url
+    stats['blocking'] = BLOCK_RESOURCES
+    stats['time_to_ready'] = time_to_ready
+    with _stats_lock:
+        PAGE_LOAD_STATS.append(stats)
+    add_usage(bytes=stats['bytes'], requests=stats['requests'])
+    logger.info(f"Page load: {stats['bytes'] / 1024:.0f} KB over {stats['requests']} requests "
+                f"in {stats['load_ms']} ms (blocking {'on' if BLOCK_RESOURCES else 'off'})",
+                extra=PER_ITEM)
+    return stats
+
+
+class BrowserPool:
+    """One lazily started Chrome instance that lends out isolated tabs
+
+    A WebDriver session only drives one window at a time, so a tab lease holds
+    the pool lock until it is released; scrapers on other threads wait for the
+    browser rather than fighting over the active window. All Chrome work is
+    therefore serialized: the pool saves startup and memory, not wall time.
+    """
+
+    def __init__(self, headless=True):
+        self.headless = headless
+        self.driver = None
+        self._base_handle = None
+        self._lock = threading.RLock()
+
+    def _start(self):
+        """Start the shared Chrome instance"""
+        from selenium import webdriver
+
+        try:
+            with span('chrome.startup'):
+                self.driver = webdriver.Chrome(options=build_chrome_options(self.headless))
+                self._base_handle = self.driver.current_window_handle
+            logger.info("Shared Chrome driver initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize shared Chrome driver: {e}")
+            raise
+
+    def acquire_tab(self):
+        """Open a fresh tab and return the driver focused on it"""
+        self._lock.acquire()
+        try:
+            if self.driver is None:
+                self._start()
+            self.driver.switch_to.new_window('tab')
+            return self.driver
+        except Exception:
+            self._lock.release()
+            raise
+
+    def release_tab(self):
+        """Close the current tab and hand the browser to the next caller"""
+        try:
+            if self.driver and self.driver.current_window_handle != self._base_handle:
+                self.driver.close()
+                self.driver.switch_to.window(self._base_handle)
+        except Exception as e:
+            logger.warning(f"Error closing browser tab: {e}")
+        finally:
+            self._lock.release()
+
+    @contextmanager
+    def tab(self):
+        """Context manager around acquire_tab()/release_tab()"""
+        driver = self.acquire_tab()
+        try:
+            yield driver
+        finally:
+            self.release_tab()
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Quit the shared Chrome instance
+
+        Waits up to timeout seconds for a tab still on lease, then quits
+        anyway; the stuck caller's next WebDriver call fails instead of
+        keeping Chrome (and the run) alive.
+        """
+        acquired = self._lock.acquire(timeout=timeout)
+        if not acquired:
+            logger.warning(f"Chrome tab still in use after {timeout:g}s, quitting the browser anyway")
+        try:
+            if self.driver:
+                try:
+                    self.driver.quit()
+                    logger.info("Shared Chrome driver closed")
+                except Exception as e:
+                    logger.warning(f"Error closing shared driver: {e}")
+                finally:
+                    self.driver = None
+                    self._base_handle = None
+        finally:
+            if acquired:
+                self._lock.release()
@@ -8,51 +8,11 @@ import pandas as pd
 import logging
 from datetime import datetime
 from colorado_ski_scraper import ColoradoSkiScraper
+from resort_registry import get_registry
+from log_setup import setup_logging
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("data_fetcher.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Known Colorado resort coordinates (from your manual data)
-RESORT_COORDINATES = {
-    'Arapahoe Basin': {'lat': 39.634108, 'lng': -105.87147},
-    'Aspen Highlands': {'lat': 39.1820055, 'lng': -106.8564},
-    'Aspen Mountain': {'lat': 39.1862685, 'lng': -106.81821},
-    'Beaver Creek': {'lat': 39.6016505, 'lng': -106.53161},
-    'Breckenridge': {'lat': 39.4782643, 'lng': -106.07232},
-    'Buttermilk': {'lat': 39.2058029, 'lng': -106.86107},
-    'Cooper': {'lat': 39.3601951, 'lng': -106.30145},
-    'Copper Mountain': {'lat': 39.5004501, 'lng': -106.15578},
-    'Crested Butte': {'lat': 38.8991036, 'lng': -106.96576},
-    'Echo Mountain': {'lat': 39.6845817, 'lng': -105.51939},
-    'Eldora': {'lat': 39.9372203, 'lng': -105.58268},
-    'Granby Ranch': {'lat': 40.0446489, 'lng': -105.90633},
-    'Hesperus': {'lat': 37.2991673, 'lng': -108.05513},
-    'Howelsen Hill': {'lat': 40.4833683, 'lng': -106.83797},
-    'Kendall Mountain': {'lat': 37.8111854, 'lng': -107.65682},
-    'Keystone': {'lat': 39.5816989, 'lng': -105.94367},
-    'Loveland': {'lat': 39.6775332, 'lng': -105.90536},
-    'Monarch': {'lat': 38.5120635, 'lng': -106.33197},
-    'Powderhorn': {'lat': 39.0693741, 'lng': -108.15071},
-    'Purgatory': {'lat': 37.6276821, 'lng': -107.83761},
-    'Silverton': {'lat': 37.884608, 'lng': -107.66592},
-    'Snowmass': {'lat': 39.2130418, 'lng': -106.93782},
-    'Steamboat': {'lat': 40.4537983, 'lng': -106.77088},
-    'Sunlight': {'lat': 39.3997821, 'lng': -107.33876},
-    'Telluride': {'lat': 37.9166674, 'lng': -107.83748},
-    'Vail': {'lat': 39.6061444, 'lng': -106.35497},
-    'Winter Park': {'lat': 39.8627761, 'lng': -105.77874},
-    'Wolf Creek': {'lat': 37.4717059, 'lng': -106.78829},
-}
-
-
 class ColoradoDataFetcher:
     """Fetches and processes Colorado resort data"""
     
@@ -96,19 +56,21 @@ class ColoradoDataFetcher:
     def _add_coordinates(self, df):
         """Add latitude/longitude to resorts"""
         
+        registry = get_registry()
+        
         def find_coordinates(name):
             """Match resort name to known coordinates"""
-            name_clean = name.lower().strip()
-            
-            for resort_name, coords in RESORT_COORDINATES.items():
-                if resort_name.lower() in name_clean or name_clean in resort_name.lower():
-                    return pd.Series([coords['lat'], coords['lng']])
+            resort = registry.lookup(name)
+            if resort:
+                return (resort.lat, resort.lng)
             
             # No match found
             logger.warning(f"No coordinates found for: {name}")
-            return pd.Series([None, None])
+            return (None, None)
         
-        df[['latitude', 'longitude']] = df['name'].apply(find_coordinates)
+        coords = pd.DataFrame([find_coordinates(name) for name in df['name']],
+                              columns=['latitude', 'longitude'], index=df.index, dtype=float)
+        df[['latitude', 'longitude']] = coords
         
         # Log resorts without coordinates
         missing = df[df['latitude'].isna()]
@@ -237,5 +199,6 @@ def main():
 
 
 if __name__ == "__main__":
+    setup_logging("data_fetcher.log")
     main()
 
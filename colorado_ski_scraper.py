@@ -5,54 +5,126 @@ Scrapes live snow conditions for all Colorado ski resorts using Selenium
 """
 
 import os
+import time
+import importlib.util
 import pandas as pd
 import logging
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
+from functools import lru_cache
+from browser_pool import (BASE_BLOCKED_URLS, apply_resource_blocking, build_chrome_options,
+                          collect_page_stats, wait_until_ready)
+from snapshots import CSCUSA_PAGE, load_snapshot, save_snapshot
+from log_setup import setup_logging
+from run_report import span
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("colorado_scraper.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# Checked without importing; lxml (and bs4) load on first parse
+HAS_LXML = importlib.util.find_spec('lxml') is not None
+
+# Card parser backends: 'lxml' walks the cards with C-accelerated XPath,
+# 'bs4' is the original BeautifulSoup/html.parser path (scoped to the cards)
+PARSER_BACKENDS = ('lxml', 'bs4')
+DEFAULT_PARSER_BACKEND = os.environ.get('CSCUSA_PARSER_BACKEND') or ('lxml' if HAS_LXML else 'bs4')
+
+# Snow cards the page must show before it counts as rendered (it lists about
+# 20 member resorts), and how long that count must hold still
+CSCUSA_MIN_CARDS = int(os.environ.get('CSCUSA_MIN_CARDS', '15'))
+CSCUSA_CARDS_STABLE_S = float(os.environ.get('CSCUSA_CARDS_STABLE_S', '1.0'))
+
+
+@lru_cache(maxsize=None)
+def _snow_card_strainer():
+    """SoupStrainer limiting the bs4 tree to the snow cards"""
+    from bs4 import SoupStrainer
+
+    return SoupStrainer('div', class_='one-snow-card')
+
+
+def _has_class(name):
+    """XPath test for a class token, like BeautifulSoup's class_='name'"""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+def _lxml_text(element):
+    """Equivalent of BeautifulSoup's get_text(strip=True)"""
+    return ''.join(text.strip() for text in element.xpath('.//text()'))
+
+
+def _lxml_find(element, xpath):
+    """First match of an element-relative XPath ('.//span'), or None
+
+    Absolute paths ('//span') would search the whole document and pick up
+    another card's fields, so they are rejected.
+    """
+    if not xpath.startswith('./'):
+        raise ValueError(f"XPath must be relative to the element: {xpath!r}")
+    found = element.xpath(xpath)
+    return found[0] if found else None
+
+
+class StableCardCount:
+    """Readiness predicate: at least N snow cards, count unchanged for a while
+
+    A partly rendered list can hold still across a couple of 250 ms polls, so
+    the count must also stay the same for stable_for seconds.
+    """
+
+    def __init__(self, min_cards=CSCUSA_MIN_CARDS, stable_for=CSCUSA_CARDS_STABLE_S, clock=time.monotonic):
+        self.min_cards = min_cards
+        self.stable_for = stable_for
+        self.clock = clock
+        self.last_count = -1
+        self.since = None
+
+    def __call__(self, driver):
+        from selenium.webdriver.common.by import By
+
+        count = len(driver.find_elements(By.CSS_SELECTOR, 'div.one-snow-card'))
+        now = self.clock()
+        if count != self.last_count:
+            self.last_count = count
+            self.since = now
+            return False
+        return count >= self.min_cards and now - self.since >= self.stable_for
+
+
 class ColoradoSkiScraper:
     """Scrapes snow conditions from Colorado Ski Country USA"""
+
+    # The snow cards are rendered by first-party scripts, so only media,
+    # fonts, styles and third-party trackers are blocked
+    BLOCKED_URLS = BASE_BLOCKED_URLS
     
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, browser_pool=None, min_cards=CSCUSA_MIN_CARDS, replay_dir=None,
+                 parser_backend=DEFAULT_PARSER_BACKEND):
+        if parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {parser_backend}")
+        if parser_backend == 'lxml' and not HAS_LXML:
+            raise ValueError("lxml parser backend requested but lxml is not installed")
+        self.parser_backend = parser_backend
         self.url = "https://www.coloradoski.com/snow-report"
         self.headless = headless
+        self.browser_pool = browser_pool
+        self.min_cards = min_cards
+        # Read the saved page snapshot from this directory instead of Chrome
+        self.replay_dir = replay_dir
         self.driver = None
+        self.time_to_ready = None
     
     def setup_driver(self):
-        """Configure Chrome driver for Selenium"""
-        chrome_options = Options()
-        
-        if self.headless:
-            chrome_options.add_argument("--headless")
-        
-        # Essential options for running in CI/cloud environments
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
-        
+        """Configure Chrome driver, or borrow a tab from the shared pool"""
+        if self.browser_pool:
+            self.driver = self.browser_pool.acquire_tab()
+            logger.info("Using a tab from the shared Chrome pool")
+            return
+
         # Initialize driver
+        from selenium import webdriver
+
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            with span('chrome.startup'):
+                self.driver = webdriver.Chrome(options=build_chrome_options(self.headless))
             logger.info("Chrome driver initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Chrome driver: {e}")
@@ -60,34 +132,27 @@ class ColoradoSkiScraper:
     
     def fetch_page(self):
         """Load the page and wait for JavaScript to render data"""
+        from selenium.common.exceptions import TimeoutException
+
         try:
-            logger.info(f"Loading {self.url}")
-            self.driver.get(self.url)
-            
-            # Wait for the page to load - look for common elements
-            # This will need adjustment based on actual page structure
-            logger.info("Waiting for page to load...")
-            
-            # Wait up to 30 seconds for content to appear
-            wait = WebDriverWait(self.driver, 30)
-            
-            # Try to wait for any of these common patterns
-            try:
-                # Wait for resort data to appear (adjust selector as needed)
-                wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-                logger.info("Page body loaded")
-                
-                # Give JavaScript extra time to load data
-                time.sleep(5)
-                
-            except Exception as e:
-                logger.warning(f"Timeout waiting for specific elements: {e}")
-                # Continue anyway - sometimes data loads without specific markers
-            
-            # Get the rendered HTML
-            html = self.driver.page_source
-            logger.info(f"Retrieved {len(html)} bytes of HTML")
-            
+            with span('cscusa.fetch_page'):
+                logger.info(f"Loading {self.url}")
+                apply_resource_blocking(self.driver, self.BLOCKED_URLS)
+                self.driver.get(self.url)
+
+                # Wait up to 30 seconds for the snow cards to finish rendering
+                logger.info("Waiting for snow cards to render...")
+                try:
+                    self.time_to_ready = wait_until_ready(self.driver, StableCardCount(self.min_cards))
+                except TimeoutException as e:
+                    logger.warning(f"Timeout waiting for snow cards: {e}")
+                    # Continue anyway - sometimes data loads without specific markers
+
+                # Get the rendered HTML
+                html = self.driver.page_source
+                logger.info(f"Retrieved {len(html)} bytes of HTML")
+                collect_page_stats(self.driver, self.url, self.time_to_ready)
+
             return html
             
         except Exception as e:
@@ -96,17 +161,26 @@ class ColoradoSkiScraper:
     
     def parse_snow_data(self, html):
         """Parse the HTML to extract resort data"""
-        soup = BeautifulSoup(html, 'html.parser')
+        if self.parser_backend == 'lxml':
+            import lxml.html
+
+            # Find all resort cards - they use class "one-snow-card"
+            resort_cards = lxml.html.fromstring(html).xpath(f'//div[{_has_class("one-snow-card")}]')
+            extract = self._extract_resort_from_lxml_card
+        else:
+            from bs4 import BeautifulSoup
+
+            # Only build the tree for the snow cards, not the whole page
+            soup = BeautifulSoup(html, 'html.parser', parse_only=_snow_card_strainer())
+            resort_cards = soup.find_all('div', class_='one-snow-card')
+            extract = self._extract_resort_from_card
         
         resorts = []
-        
-        # Find all resort cards - they use class "one-snow-card"
-        resort_cards = soup.find_all('div', class_='one-snow-card')
         logger.info(f"Found {len(resort_cards)} resort cards")
         
         for card in resort_cards:
             try:
-                resort_data = self._extract_resort_from_card(card)
+                resort_data = extract(card)
                 if resort_data:
                     resorts.append(resort_data)
             except Exception as e:
@@ -180,6 +254,56 @@ class ColoradoSkiScraper:
             logger.warning(f"Error extracting resort card: {e}")
             return None
     
+    def _extract_resort_from_lxml_card(self, card):
+        """lxml version of _extract_resort_from_card; must return identical dicts"""
+        try:
+            resort = {}
+            
+            name_elem = _lxml_find(card, './/h3[@class="h5 text-left"]')
+            if name_elem is None:
+                name_elem = _lxml_find(card, f'.//h3[{_has_class("h5")}]')
+            
+            if name_elem is not None:
+                resort['name'] = _lxml_text(name_elem)
+            else:
+                return None
+            
+            for key, css_class in (('new_snow_24h', 'answer twentyfour'),
+                                   ('new_snow_48h', 'answer fortyeight'),
+                                   ('mid_mtn_depth', 'answer mid-mtn')):
+                elem = _lxml_find(card, f'.//span[@class="{css_class}"]')
+                resort[key] = self._parse_snow(_lxml_text(elem)) if elem is not None else 0
+            
+            surface = _lxml_find(card, f'.//p[{_has_class("surface")}]')
+            if surface is not None:
+                surface_span = _lxml_find(surface, './/span')
+                resort['surface_conditions'] = _lxml_text(surface_span) if surface_span is not None else ''
+            else:
+                resort['surface_conditions'] = ''
+            
+            resort['lifts_open'] = '0/0'
+            lifts_elem = _lxml_find(card, f'.//p[{_has_class("lifts-open")}]')
+            if lifts_elem is not None:
+                open_span = _lxml_find(lifts_elem, f'.//span[{_has_class("open")}]')
+                total_span = _lxml_find(lifts_elem, f'.//span[{_has_class("total")}]')
+                if open_span is not None and total_span is not None:
+                    resort['lifts_open'] = f"{_lxml_text(open_span)}/{_lxml_text(total_span)}"
+            
+            status_open = _lxml_find(card, f'.//span[{_has_class("open")}]')
+            status_closed = _lxml_find(card, f'.//span[{_has_class("closed")}]')
+            if status_open is not None and 'mt-3' in (status_open.get('class') or '').split():
+                resort['status'] = 'Open'
+            elif status_closed is not None:
+                resort['status'] = 'Closed'
+            else:
+                resort['status'] = 'Unknown'
+            
+            return resort
+            
+        except Exception as e:
+            logger.warning(f"Error extracting resort card: {e}")
+            return None
+    
     def _parse_snow(self, text):
         """Extract snow amount from text like '24-hour snow total: 5\"' """
         import re
@@ -199,13 +323,15 @@ class ColoradoSkiScraper:
     def scrape(self):
         """Main scraping method"""
         try:
-            self.setup_driver()
-            html = self.fetch_page()
-            
-            # Save HTML for debugging
-            with open('colorado_ski_page_rendered.html', 'w', encoding='utf-8') as f:
-                f.write(html)
-            logger.info("Saved rendered HTML to colorado_ski_page_rendered.html")
+            if self.replay_dir:
+                html = load_snapshot(self.replay_dir, CSCUSA_PAGE)
+            else:
+                self.setup_driver()
+                html = self.fetch_page()
+                
+                # Save HTML for debugging and replay
+                save_snapshot(CSCUSA_PAGE, html)
+                logger.info(f"Saved rendered HTML to {CSCUSA_PAGE}")
             
             resorts = self.parse_snow_data(html)
             
@@ -258,7 +384,10 @@ class ColoradoSkiScraper:
     
     def cleanup(self):
         """Clean up resources"""
-        if self.driver:
+        if self.driver and self.browser_pool:
+            self.browser_pool.release_tab()
+            self.driver = None
+        elif self.driver:
             try:
                 self.driver.quit()
                 logger.info("Chrome driver closed")
@@ -317,5 +446,6 @@ def main():
 
 
 if __name__ == "__main__":
+    setup_logging("colorado_scraper.log")
     main()
 
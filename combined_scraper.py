@@ -8,90 +8,73 @@ Adds coordinates from known resort locations
 import pandas as pd
 import logging
 import os
+import time
+import threading
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from onthesnow_scraper import OnTheSnowScraper
-from colorado_ski_scraper import ColoradoSkiScraper
-from aspen_snowmass_scraper import AspenSnowmassScraper
+from concurrent.futures import Future, wait
+from snapshots import REPLAY_DIR
+from source_cache import SourceCache, format_age
+from resort_registry import get_registry
+from log_setup import PER_ITEM, setup_logging, shutdown_logging
+from run_report import current_span, in_current_span, span, timed, write_report
+from profiling import profiled
 
 # Set to skip individual page visits for faster execution (e.g., in CI)
 SKIP_DETAIL_PAGES = os.environ.get('SKIP_DETAIL_PAGES', 'false').lower() == 'true'
 
-# Colorado resort coordinates and trail counts
-# Trail counts from user's manual data CSV (Colorado Ski Area Data - Sheet1.csv)
-# Lift counts estimated from resort data
-RESORT_DATA = {
-    'Arapahoe Basin': {'lat': 39.634108, 'lng': -105.87147, 'total_trails': 147, 'total_lifts': 9},
-    'Arapahoe Basin Ski Area': {'lat': 39.634108, 'lng': -105.87147, 'total_trails': 147, 'total_lifts': 9},
-    'Aspen Highlands': {'lat': 39.1820055, 'lng': -106.8564, 'total_trails': 116, 'total_lifts': 5},
-    'Aspen Mountain': {'lat': 39.1862685, 'lng': -106.81821, 'total_trails': 104, 'total_lifts': 8},
-    'Beaver Creek': {'lat': 39.6016505, 'lng': -106.53161, 'total_trails': 176, 'total_lifts': 25},
-    'Breckenridge': {'lat': 39.4782643, 'lng': -106.07232, 'total_trails': 193, 'total_lifts': 35},
-    'Buttermilk': {'lat': 39.2058029, 'lng': -106.86107, 'total_trails': 44, 'total_lifts': 8},
-    'Cooper': {'lat': 39.3601951, 'lng': -106.30145, 'total_trails': 65, 'total_lifts': 5},
-    'Copper Mountain': {'lat': 39.5004501, 'lng': -106.15578, 'total_trails': 159, 'total_lifts': 24},
-    'Crested Butte': {'lat': 38.8991036, 'lng': -106.96576, 'total_trails': 168, 'total_lifts': 16},
-    'Echo Mountain': {'lat': 39.6845817, 'lng': -105.51939, 'total_trails': 7, 'total_lifts': 3},
-    'Eldora': {'lat': 39.9372203, 'lng': -105.58268, 'total_trails': 62, 'total_lifts': 12},
-    'Granby Ranch': {'lat': 40.0446489, 'lng': -105.90633, 'total_trails': 54, 'total_lifts': 5},
-    'Hesperus': {'lat': 37.2991673, 'lng': -108.05513, 'total_trails': 26, 'total_lifts': 2},
-    'Howelsen Hill': {'lat': 40.4833683, 'lng': -106.83797, 'total_trails': 17, 'total_lifts': 3},
-    'Kendall Mountain': {'lat': 37.8111854, 'lng': -107.65682, 'total_trails': 7, 'total_lifts': 2},
-    'Keystone': {'lat': 39.5816989, 'lng': -105.94367, 'total_trails': 142, 'total_lifts': 21},
-    'Loveland': {'lat': 39.6775332, 'lng': -105.90536, 'total_trails': 94, 'total_lifts': 10},
-    'Loveland Ski Area': {'lat': 39.6775332, 'lng': -105.90536, 'total_trails': 94, 'total_lifts': 10},
-    'Monarch': {'lat': 38.5120635, 'lng': -106.33197, 'total_trails': 67, 'total_lifts': 7},
-    'Powderhorn': {'lat': 39.0693741, 'lng': -108.15071, 'total_trails': 57, 'total_lifts': 4},
-    'Purgatory': {'lat': 37.6276821, 'lng': -107.83761, 'total_trails': 107, 'total_lifts': 11},
-    'Purgatory Resort': {'lat': 37.6276821, 'lng': -107.83761, 'total_trails': 107, 'total_lifts': 11},
-    'Silverton': {'lat': 37.884608, 'lng': -107.66592, 'total_trails': 0, 'total_lifts': 2},  # No trail count in manual data
-    'Snowmass': {'lat': 39.2130418, 'lng': -106.93782, 'total_trails': 98, 'total_lifts': 21},
-    'Steamboat': {'lat': 40.4537983, 'lng': -106.77088, 'total_trails': 184, 'total_lifts': 18},
-    'Sunlight': {'lat': 39.3997821, 'lng': -107.33876, 'total_trails': 77, 'total_lifts': 4},
-    'Telluride': {'lat': 37.9166674, 'lng': -107.83748, 'total_trails': 149, 'total_lifts': 19},
-    'Vail': {'lat': 39.6061444, 'lng': -106.35497, 'total_trails': 277, 'total_lifts': 31},
-    'Winter Park': {'lat': 39.8627761, 'lng': -105.77874, 'total_trails': 171, 'total_lifts': 24},
-    'Wolf Creek': {'lat': 37.4717059, 'lng': -106.78829, 'total_trails': 133, 'total_lifts': 7},
-}
+# Seconds to wait for a fresh scrape before merging a source's cached frame
+# instead; the scrape keeps running and refreshes the cache when it finishes.
+# Sources with nothing cached are always waited for
+SOURCE_DEADLINE = float(os.environ.get('SOURCE_DEADLINE', '300'))
+
+# Seconds past the deadline a late scrape may keep running to refresh the
+# cache; after that Chrome is shut down and the scrape is abandoned (its
+# thread is a daemon, so it never holds the process open)
+SOURCE_REFRESH_GRACE = float(os.environ.get('SOURCE_REFRESH_GRACE', '120'))
+
+# Source key -> the `source` label its rows carry after the merge
+SOURCE_LABELS = {'onthesnow': 'OnTheSnow', 'cscusa': 'CSCUSA', 'aspen': 'Aspen Official'}
+
+# Resort coordinates, trail/lift totals and source aliases (resorts.csv)
+REGISTRY = get_registry()
+RESORT_DATA = REGISTRY.as_dict()
+RESORT_ALIASES = REGISTRY.aliases
+
+# Built once at load: resolves any scraped name to a RESORT_DATA key
+RESORT_INDEX = REGISTRY.index
 
 # Max snowfall cap to handle data errors (inches)
 MAX_24H_SNOWFALL = 12
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("combined_scraper.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# (reaper thread, late futures, monotonic expiry) per run with late scrapes
+_late_scrapes = []
+_late_scrapes_lock = threading.Lock()
+
 
 def add_resort_data(df):
     """Add latitude, longitude, trail counts, and lift counts to resorts"""
     
     def find_resort_data(name):
         """Find complete resort data by name"""
-        name_clean = name.strip().lower()
-        
-        # Try exact match first
-        if name in RESORT_DATA:
-            data = RESORT_DATA[name]
-            return pd.Series([data['lat'], data['lng'], data['total_trails'], data['total_lifts']])
-        
-        # Try partial matching
-        for resort_name, data in RESORT_DATA.items():
-            if resort_name.lower() in name_clean or name_clean in resort_name.lower():
-                return pd.Series([data['lat'], data['lng'], data['total_trails'], data['total_lifts']])
+        canonical = RESORT_INDEX.resolve(name)
+        if canonical:
+            data = RESORT_DATA[canonical]
+            return (data['lat'], data['lng'], data['total_trails'], data['total_lifts'])
         
         # No match found
         logger.warning(f"⚠️ No resort data found for: {name}")
-        return pd.Series([None, None, None, None])
+        return (None, None, None, None)
     
     # Add coordinates and trail/lift totals
-    df[['latitude', 'longitude', 'total_trails_manual', 'total_lifts_manual']] = df['name'].apply(find_resort_data)
+    manual = pd.DataFrame(
+        [find_resort_data(name) for name in df['name']],
+        columns=['latitude', 'longitude', 'total_trails_manual', 'total_lifts_manual'],
+        index=df.index,
+        dtype=float,
+    )
+    df[manual.columns] = manual
     
     # Fill in missing total_trails and total_lifts from manual data
     df['total_trails'] = df['total_trails'].fillna(df['total_trails_manual'])
@@ -130,16 +113,13 @@ def add_missing_major_resorts(df):
     # Major resorts to always include (even if closed/not scraped)
     must_include = ['Vail', 'Beaver Creek', 'Crested Butte', 'Wolf Creek']
     
-    existing_names = df['name'].str.lower().tolist()
-    existing_normalized = [name.replace(' ski area', '').replace(' resort', '').replace(' mountain', '').strip() 
-                          for name in existing_names]
+    existing = {RESORT_INDEX.key(name) for name in df['name']}
     
     missing_resorts = []
     
     for resort_name in must_include:
-        # Check if resort is already in the data (by normalized name)
-        resort_normalized = resort_name.lower()
-        if not any(resort_normalized in existing for existing in existing_normalized):
+        # Check if resort is already in the data (by resolved name)
+        if resort_name not in existing:
             # Resort is missing - add it as placeholder
             if resort_name in RESORT_DATA:
                 data = RESORT_DATA[resort_name]
@@ -165,7 +145,7 @@ def add_missing_major_resorts(df):
                     'trails_open_pct': 0.0,
                     'lifts_open_pct': 0.0,
                 })
-                logger.info(f"  + Added placeholder for {resort_name} ({data['total_trails']} trails)")
+                logger.info(f"  + Added placeholder for {resort_name} ({data['total_trails']} trails)", extra=PER_ITEM)
     
     if missing_resorts:
         missing_df = pd.DataFrame(missing_resorts)
@@ -177,11 +157,76 @@ def add_missing_major_resorts(df):
     return df
 
 
-def scrape_onthesnow():
+def cap_snowfall(df, source_label):
+    """Cap implausible 24h snowfall values (masked, no per-row loop)"""
+    if df.empty or 'new_snow_24h' not in df.columns:
+        return df
+    high_snow_mask = df['new_snow_24h'] > MAX_24H_SNOWFALL
+    if high_snow_mask.any():
+        flagged = ', '.join(f"{name} ({value}\")" for name, value in
+                            zip(df.loc[high_snow_mask, 'name'], df.loc[high_snow_mask, 'new_snow_24h']))
+        logger.warning(f"⚠️ High snowfall detected ({source_label}): {flagged}. Capping at {MAX_24H_SNOWFALL}\".")
+        df = df.copy()
+        df.loc[high_snow_mask, 'new_snow_24h'] = MAX_24H_SNOWFALL
+    return df
+
+
+def _keyed(df):
+    """Index a source frame by resolved resort key, first row per resort wins"""
+    keys = df['name'].map(RESORT_INDEX.key)
+    return df.set_index(keys.rename('resort_key')).loc[lambda d: ~d.index.duplicated(keep='first')]
+
+
+def merge_sources(ots_df, cscusa_df, aspen_df):
+    """
+    Align the three sources on resolved resort key and merge column-wise
+
+    CSCUSA only adds resorts OnTheSnow lacks (never cells of OnTheSnow
+    rows); Aspen Official overwrites every column it has.
+    """
+    frames = []
+    if not ots_df.empty:
+        frames.append(_keyed(cap_snowfall(ots_df, 'OnTheSnow')))
+
+    logger.info("\n📊 Processing CSCUSA supplement data...")
+    if not cscusa_df.empty:
+        cscusa = _keyed(cscusa_df.assign(name_lower=cscusa_df['name'].str.lower(), source='CSCUSA'))
+        new_keys = cscusa.index.difference(frames[0].index) if frames else cscusa.index
+
+        if len(new_keys) > 0:
+            # Apply snowfall sanity check to CSCUSA data too
+            cscusa = cap_snowfall(cscusa.loc[new_keys], 'CSCUSA')
+            logger.info(f"📝 CSCUSA adds {len(new_keys)} new resorts: {', '.join(cscusa['name'])}")
+            frames.append(cscusa)
+        else:
+            logger.info("ℹ️ CSCUSA had no additional resorts (all already in OnTheSnow)")
+
+    if not frames:
+        return pd.DataFrame()
+
+    combined_df = pd.concat(frames) if len(frames) > 1 else frames[0]
+
+    # 5. PATCH ASPEN DATA: Overwrite all stats with official data if we have it
+    if not aspen_df.empty:
+        aspen = _keyed(aspen_df.assign(source='Aspen Official'))
+        matched = combined_df.index.intersection(aspen.index)
+        if len(matched) > 0:
+            logger.info(f"💉 Patching with 100% verified official data: {', '.join(combined_df.loc[matched, 'name'])}")
+            for column in aspen.columns.difference(combined_df.columns):
+                combined_df[column] = pd.NA
+            combined_df.loc[matched, aspen.columns] = aspen.loc[matched, aspen.columns]
+
+    return combined_df.reset_index(drop=True)
+
+
+def scrape_onthesnow(browser_pool=None, replay_dir=None):
     """Scrape OnTheSnow data (runs in parallel)"""
     logger.info("📊 [PARALLEL] Scraping OnTheSnow (primary source)...")
     try:
-        ots_scraper = OnTheSnowScraper(headless=True, skip_detail_pages=SKIP_DETAIL_PAGES)
+        from onthesnow_scraper import OnTheSnowScraper
+
+        ots_scraper = OnTheSnowScraper(headless=True, skip_detail_pages=SKIP_DETAIL_PAGES,
+                                       browser_pool=browser_pool, replay_dir=replay_dir)
         ots_df = ots_scraper.scrape()
 
         if not ots_df.empty:
@@ -191,13 +236,6 @@ def scrape_onthesnow():
                 logger.info(f"🗑️ Filtering out aggregated 'Aspen Snowmass' from OnTheSnow")
                 ots_df = ots_df[~aspen_mask].copy()
 
-            # Apply snowfall sanity check
-            high_snow_mask = ots_df['new_snow_24h'] > MAX_24H_SNOWFALL
-            if high_snow_mask.any():
-                for idx, row in ots_df[high_snow_mask].iterrows():
-                    logger.warning(f"⚠️ High snowfall detected for {row['name']}: {row['new_snow_24h']}\". Capping at {MAX_24H_SNOWFALL}\".")
-                ots_df.loc[high_snow_mask, 'new_snow_24h'] = MAX_24H_SNOWFALL
-
             logger.info(f"✅ OnTheSnow: Found {len(ots_df)} resorts")
             return ('onthesnow', ots_df)
         else:
@@ -209,11 +247,14 @@ def scrape_onthesnow():
         return ('onthesnow', pd.DataFrame())
 
 
-def scrape_cscusa():
+def scrape_cscusa(browser_pool=None, replay_dir=None):
     """Scrape CSCUSA data (runs in parallel)"""
     logger.info("📊 [PARALLEL] Scraping CSCUSA (supplement)...")
     try:
-        cscusa_scraper = ColoradoSkiScraper(headless=True)
+        from colorado_ski_scraper import ColoradoSkiScraper
+
+        cscusa_scraper = ColoradoSkiScraper(headless=True, browser_pool=browser_pool,
+                                            replay_dir=replay_dir)
         cscusa_df = cscusa_scraper.scrape()
 
         if not cscusa_df.empty:
@@ -228,11 +269,13 @@ def scrape_cscusa():
         return ('cscusa', pd.DataFrame())
 
 
-def scrape_aspen():
+def scrape_aspen(replay_dir=None):
     """Scrape Aspen Official data (runs in parallel)"""
     logger.info("📊 [PARALLEL] Scraping Aspen Official (granular snow supplement)...")
     try:
-        aspen_scraper = AspenSnowmassScraper(headless=True)
+        from aspen_snowmass_scraper import AspenSnowmassScraper
+
+        aspen_scraper = AspenSnowmassScraper(headless=True, replay_dir=replay_dir)
         aspen_df = aspen_scraper.scrape()
         if not aspen_df.empty:
             logger.info(f"✅ Aspen Official: Found {len(aspen_df)} mountains")
@@ -245,127 +288,200 @@ def scrape_aspen():
         return ('aspen', pd.DataFrame())
 
 
-def combine_resort_data():
+def mark_stale(df, stale_ages):
+    """Record the cache age of rows merged from cached sources
+
+    stale_age_min holds the age in minutes; fresh rows get a blank age.
+    `source` keeps its usual label either way. prepare_data publishes the
+    age in Data Source and backdates Last Updated for these rows.
+    """
+    labels = {SOURCE_LABELS[key]: age for key, age in stale_ages.items()}
+    df = df.copy()
+    df['stale_age_min'] = (df['source'].map(labels) / 60).round()
+    return df
+
+
+def _source_result(future, source_key, cache, stale_ages):
+    """A finished scrape's frame, or the cached one if it failed or came back empty"""
+    label = SOURCE_LABELS[source_key]
+    try:
+        _, df = future.result()
+    except Exception as e:
+        logger.error(f"❌ {label} failed: {e}")
+        df = pd.DataFrame()
+
+    if not df.empty:
+        logger.info(f"✅ {label} completed")
+        if cache:
+            cache.put(source_key, df)
+        return df
+
+    cached = cache.get(source_key) if cache else None
+    if cached is None:
+        return df
+    cached_df, age = cached
+    logger.warning(f"⚠️ {label} returned no data; using cached result from {format_age(age)} ago")
+    stale_ages[source_key] = age
+    return cached_df
+
+
+def _refresh_cache(source_key, cache):
+    """Done-callback for a scrape that missed the deadline: cache its result for the next run"""
+    def callback(future):
+        try:
+            _, df = future.result()
+        except Exception as e:
+            logger.warning(f"🔄 Background {SOURCE_LABELS[source_key]} scrape failed: {e}")
+            return
+        if not df.empty:
+            cache.put(source_key, df)
+            logger.info(f"🔄 {SOURCE_LABELS[source_key]} finished after the deadline; cache refreshed")
+    return callback
+
+
+def _start_source(source_key, func, *args):
+    """Run one source scraper on a daemon thread and return its Future
+
+    Not a ThreadPoolExecutor: its workers are joined at interpreter exit, so
+    a scrape abandoned at the deadline would still hold the process open.
+    """
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"source-{source_key}", daemon=True).start()
+    return future
+
+
+def _shutdown_when_done(futures, browser_pool, grace):
+    """Quit Chrome now, or once late scrapes finish or grace seconds pass"""
+    running = [future for future in futures if not future.done()]
+    if not running:
+        browser_pool.shutdown()
+        return
+
+    def reap():
+        _, not_done = wait(running, timeout=grace)
+        if not_done:
+            logger.warning(f"🔄 {len(not_done)} late scrape(s) still running after the "
+                           f"{grace:.0f}s grace; abandoning them")
+        # Don't wait on a tab an abandoned scrape may still hold
+        browser_pool.shutdown(timeout=0)
+
+    reaper = threading.Thread(target=reap, name='browser-pool-reaper', daemon=True)
+    reaper.start()
+    with _late_scrapes_lock:
+        _late_scrapes.append((reaper, running, time.monotonic() + grace))
+
+
+def wait_for_late_scrapes():
+    """Give scrapes that missed the deadline the rest of their grace to refresh the cache
+
+    Returns True once they are all finished and Chrome is shut down, False
+    if some were abandoned. Call before exiting; it never waits past
+    SOURCE_REFRESH_GRACE after the deadline (plus Chrome's shutdown).
+    """
+    with _late_scrapes_lock:
+        late = list(_late_scrapes)
+        _late_scrapes.clear()
+    for reaper, _, expires in late:
+        reaper.join(max(0, expires - time.monotonic()) + 10)
+    return all(future.done() for _, running, _ in late for future in running)
+
+
+def _timed_source(scrape, *args):
+    """Run one source scraper inside its own run-report span"""
+    with span(scrape.__name__) as source_span:
+        source_key, df = scrape(*args)
+        source_span.set(rows=len(df))
+    return source_key, df
+
+
+@timed('combine_resort_data')
+def combine_resort_data(replay_dir=REPLAY_DIR):
     """
     Scrape from all sources IN PARALLEL and combine
     OnTheSnow is primary, CSCUSA supplements, Aspen provides granular data
+
+    With replay_dir set, every source is read from saved snapshots instead
+    of the network (no Chrome is started).
     """
     logger.info("="*70)
     logger.info("COMBINED SCRAPER - PARALLEL MODE")
     logger.info("="*70)
     if SKIP_DETAIL_PAGES:
         logger.info("⚡ SKIP_DETAIL_PAGES=true - skipping individual resort page visits for speed")
+    if replay_dir:
+        logger.info(f"⏪ Replaying snapshots from {replay_dir}")
 
-    all_resorts = []
-    ots_df = pd.DataFrame()
-    cscusa_df = pd.DataFrame()
-    aspen_official_data = {}
+    from browser_pool import BrowserPool
 
-    # Run all three scrapers in parallel
-    logger.info("\n🚀 Starting parallel scraping of all data sources...")
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        futures = {
-            executor.submit(scrape_onthesnow): 'OnTheSnow',
-            executor.submit(scrape_cscusa): 'CSCUSA',
-            executor.submit(scrape_aspen): 'Aspen'
-        }
-
-        for future in as_completed(futures):
-            source_name = futures[future]
-            try:
-                source_key, df = future.result(timeout=300)  # 5 min timeout per scraper
-
-                if source_key == 'onthesnow' and not df.empty:
-                    ots_df = df
-                    all_resorts.append(df)
-                elif source_key == 'cscusa' and not df.empty:
-                    cscusa_df = df
-                elif source_key == 'aspen' and not df.empty:
-                    for _, row in df.iterrows():
-                        aspen_official_data[row['name']] = row.to_dict()
-
-                logger.info(f"✅ {source_name} completed")
-            except Exception as e:
-                logger.error(f"❌ {source_name} failed: {e}")
+    frames = {}
+    stale_ages = {}
+    # Replays stay deterministic: no cached frames in, none written out
+    cache = None if replay_dir else SourceCache()
 
-    logger.info("\n📊 Processing CSCUSA supplement data...")
-    # Now process CSCUSA data - only add resorts NOT in OnTheSnow
-    if not cscusa_df.empty:
-        ots_resort_names = set(ots_df['name'].str.lower()) if not ots_df.empty else set()
-        cscusa_df['name_lower'] = cscusa_df['name'].str.lower()
-        new_resorts = cscusa_df[~cscusa_df['name_lower'].isin(ots_resort_names)]
-
-        if len(new_resorts) > 0:
-            # Apply snowfall sanity check to CSCUSA data too
-            high_snow_mask = new_resorts['new_snow_24h'] > MAX_24H_SNOWFALL
-            if high_snow_mask.any():
-                for idx, row in new_resorts[high_snow_mask].iterrows():
-                    logger.warning(f"⚠️ High snowfall detected for {row['name']} (CSCUSA): {row['new_snow_24h']}\". Capping at {MAX_24H_SNOWFALL}\".")
-                new_resorts = new_resorts.copy()
-                new_resorts.loc[high_snow_mask, 'new_snow_24h'] = MAX_24H_SNOWFALL
-
-            logger.info(f"📝 CSCUSA adds {len(new_resorts)} new resorts:")
-            for name in new_resorts['name']:
-                logger.info(f"  + {name}")
-
-            new_resorts = new_resorts.copy()
-            new_resorts['source'] = 'CSCUSA'
-            all_resorts.append(new_resorts)
-        else:
-            logger.info("ℹ️ CSCUSA had no additional resorts (all already in OnTheSnow)")
+    # Run all three scrapers in parallel, sharing one Chrome instance
+    logger.info("\n🚀 Starting parallel scraping of all data sources...")
+    browser_pool = BrowserPool(headless=True)
+    sources = {
+        'onthesnow': (scrape_onthesnow, browser_pool, replay_dir),
+        'cscusa': (scrape_cscusa, browser_pool, replay_dir),
+        'aspen': (scrape_aspen, replay_dir),
+    }
+    futures = {
+        _start_source(source_key, in_current_span(_timed_source), *args): source_key
+        for source_key, args in sources.items()
+    }
+    try:
+        done, pending = wait(futures, timeout=SOURCE_DEADLINE if cache else None)
+        for future in done:
+            frames[futures[future]] = _source_result(future, futures[future], cache, stale_ages)
+
+        for future in pending:
+            source_key = futures[future]
+            cached = cache.get(source_key)
+            if cached is None:
+                # Nothing to fall back on, so keep waiting for the scrape
+                frames[source_key] = _source_result(future, source_key, cache, stale_ages)
+                continue
+            frames[source_key], stale_ages[source_key] = cached
+            logger.warning(f"⏳ {SOURCE_LABELS[source_key]} still running after {SOURCE_DEADLINE:.0f}s; "
+                           f"using cached result from {format_age(stale_ages[source_key])} ago")
+            future.add_done_callback(_refresh_cache(source_key, cache))
+    finally:
+        _shutdown_when_done(futures, browser_pool, SOURCE_REFRESH_GRACE)
 
     # 4. Combine all data
-    if not all_resorts:
+    with span('merge_sources') as merge_span:
+        combined_df = merge_sources(
+            frames.get('onthesnow', pd.DataFrame()),
+            frames.get('cscusa', pd.DataFrame()),
+            frames.get('aspen', pd.DataFrame()),
+        )
+        merge_span.set(rows=len(combined_df))
+    if combined_df.empty:
         logger.error("❌ No data from any source!")
         return pd.DataFrame()
-    
-    combined_df = pd.concat(all_resorts, ignore_index=True)
-    
-    # Remove duplicate resorts with better deduplication logic
-    def normalize_name(name):
-        """Normalize resort names for duplicate detection"""
-        name = name.lower().strip()
-        # Remove common suffixes
-        name = name.replace(' ski area', '').replace(' ski resort', '')
-        name = name.replace(' resort', '').replace(' mountain resort', '')
-        name = name.replace(' mountain', '')
-        return name
-    
-    combined_df['name_normalized'] = combined_df['name'].apply(normalize_name)
-    
-    # Sort to prioritize OnTheSnow/CSCUSA for terrain data
-    combined_df = combined_df.drop_duplicates(subset=['name_normalized'], keep='first')
-    
-    # 5. PATCH ASPEN DATA: Overwrite all stats with official data if we have it
-    for idx, row in combined_df.iterrows():
-        name = row['name']
-        # Check if this name (or normalized version) is in our official Aspen data
-        official_match = None
-        if name in aspen_official_data:
-            official_match = aspen_official_data[name]
-        else:
-            # Try matching by normalized name for Aspen resorts
-            for a_name, a_data in aspen_official_data.items():
-                if normalize_name(a_name) == normalize_name(name):
-                    official_match = a_data
-                    break
-        
-        if official_match:
-            logger.info(f"💉 Patching {name} with 100% verified official data")
-            # Overwrite EVERYTHING from the official source
-            for key, value in official_match.items():
-                combined_df.at[idx, key] = value
-            combined_df.at[idx, 'source'] = "Aspen Official"
-
-    combined_df = combined_df.drop(columns=['name_normalized'])
+    if stale_ages:
+        combined_df = mark_stale(combined_df, stale_ages)
+        current_span().set(stale_sources={key: round(age) for key, age in stale_ages.items()})
     
     # 6. Add coordinates, trail counts, and calculate percentages
     logger.info("\n📍 Adding resort data (coordinates, trail counts, percentages)...")
-    combined_df = add_resort_data(combined_df)
-    
-    # 7. Add missing major resorts (not yet scraped but should be shown)
-    logger.info("\n➕ Checking for missing major resorts...")
-    combined_df = add_missing_major_resorts(combined_df)
+    with span('enrich') as enrich_span:
+        combined_df = add_resort_data(combined_df)
+
+        # 7. Add missing major resorts (not yet scraped but should be shown)
+        logger.info("\n➕ Checking for missing major resorts...")
+        combined_df = add_missing_major_resorts(combined_df)
+        enrich_span.set(rows=len(combined_df))
     
     # Sort by name
     combined_df = combined_df.sort_values('name').reset_index(drop=True)
@@ -383,10 +499,12 @@ def combine_resort_data():
         logger.info(f"From OnTheSnow: {ots_count}")
         logger.info(f"From Aspen Official: {aspen_count}")
         logger.info(f"From CSCUSA: {cscusa_count}")
-    
+
+    current_span().set(rows=len(combined_df))
     return combined_df
 
 
+@profiled('combined_scraper')
 def main():
     """Test the combined scraper"""
     df = combine_resort_data()
@@ -413,4 +531,10 @@ def main():
 
 
 if __name__ == "__main__":
+    setup_logging("combined_scraper.log")
     main()
+    write_report("combined_scraper_report.json")
+    if not wait_for_late_scrapes():
+        # Worker pools inside abandoned scrapes would still be joined at exit
+        shutdown_logging()
+        os._exit(0)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Forecast Cache
+On-disk cache of Open-Meteo payloads keyed by location, variables and the
+upstream model run they came from; a payload stays valid until the model
+issues a new run, so frequent forecast runs don't multiply API load
+"""
+
+import os
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+FORECAST_CACHE_FILE = os.environ.get('FORECAST_CACHE_FILE', 'forecast_cache.json')
+
+# Oldest payload ever served, in seconds, even within the same model run
+FORECAST_CACHE_MAX_AGE = int(os.environ.get('FORECAST_CACHE_MAX_AGE', str(3 * 3600)))
+
+
+def cache_key(lat, lon, variables, days, model=None):
+    """Cache key for one location's request"""
+    return f"{lat:.4f},{lon:.4f}|{','.join(variables)}|{days}|{model or 'best_match'}"
+
+
+class ForecastCache:
+    """Payload cache valid for one model run
+
+    model_run identifies the latest upstream run (e.g. its initialisation
+    time); entries saved under any other run are misses. Entries older than
+    max_age are misses either way, which is all that applies when model_run
+    is None.
+    """
+
+    def __init__(self, path=FORECAST_CACHE_FILE, model_run=None, force_refresh=False,
+                 max_age=FORECAST_CACHE_MAX_AGE):
+        self.path = path
+        self.model_run = model_run
+        self.force_refresh = force_refresh
+        self.max_age = max_age
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._served_ages = []
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('entries', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable forecast cache {self.path}: {e}")
+            self.entries = {}
+
+    def _is_fresh(self, entry, now):
+        if self.model_run is not None and entry.get('model_run') != self.model_run:
+            return False
+        return now - entry.get('fetched_at', 0) <= self.max_age
+
+    def get(self, key):
+        """Cached payload for key if still valid for the current model run"""
+        entry = self.entries.get(key)
+        now = time.time()
+        if self.force_refresh or entry is None or not self._is_fresh(entry, now):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._served_ages.append(now - entry['fetched_at'])
+        return entry['payload']
+
+    def put(self, key, payload):
+        self.entries[key] = {
+            'model_run': self.model_run,
+            'fetched_at': time.time(),
+            'payload': payload,
+        }
+
+    def save(self):
+        """Write entries still valid for the current run, dropping the rest"""
+        now = time.time()
+        entries = {k: v for k, v in self.entries.items() if self._is_fresh(v, now)}
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'model_run': self.model_run, 'entries': entries}, f)
+        except OSError as e:
+            logger.warning(f"Could not save forecast cache {self.path}: {e}")
+
+    def freshness(self):
+        """Summary of what this run served from cache vs fetched"""
+        return {
+            'model_run': self.model_run,
+            'force_refresh': self.force_refresh,
+            'cached': self.hits,
+            'fetched': self.misses,
+            'oldest_served_age_s': round(max(self._served_ages)) if self._served_ages else None,
+        }
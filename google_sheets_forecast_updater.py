@@ -5,36 +5,22 @@ Uploads Colorado snowfall forecast CSV to Google Sheets for Datawrapper.
 """
 
 import os
-import json
 import logging
-import pandas as pd
 from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from sheets_client import get_sheets_client
+from log_setup import setup_logging
+from run_report import write_report
 
 
 # Load environment variables
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("google_sheets_forecast_updater.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 # Configuration
 FORECAST_SPREADSHEET_ID = os.environ.get("GOOGLE_SHEETS_FORECAST_ID")
 CREDENTIALS_JSON = os.environ.get("GOOGLE_CREDENTIALS")
 
-# Google Sheets API scopes
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-
 
 class GoogleSheetsForecastUpdater:
     """Handles updating Google Sheets with Colorado forecast data"""
@@ -42,6 +28,7 @@ class GoogleSheetsForecastUpdater:
     def __init__(self, spreadsheet_id=None, credentials_json=None):
         self.spreadsheet_id = spreadsheet_id or FORECAST_SPREADSHEET_ID
         self.credentials_json = credentials_json or CREDENTIALS_JSON
+        self.client = None
         self.service = None
 
         if not self.spreadsheet_id:
@@ -54,23 +41,8 @@ class GoogleSheetsForecastUpdater:
         """Authenticate with Google Sheets API using service account"""
         try:
             logger.info("Authenticating with Google Sheets API...")
-
-            if isinstance(self.credentials_json, str):
-                cleaned = self.credentials_json.strip()
-                if cleaned.startswith("'") and cleaned.endswith("'"):
-                    cleaned = cleaned[1:-1]
-                if cleaned.startswith('"') and cleaned.endswith('"'):
-                    cleaned = cleaned[1:-1]
-                credentials_dict = json.loads(cleaned)
-            else:
-                credentials_dict = self.credentials_json
-
-            credentials = service_account.Credentials.from_service_account_info(
-                credentials_dict,
-                scopes=SCOPES
-            )
-
-            self.service = build('sheets', 'v4', credentials=credentials)
+            self.client = get_sheets_client(self.credentials_json)
+            self.service = self.client.service
             logger.info("✅ Successfully authenticated with Google Sheets API")
             return True
 
@@ -80,6 +52,8 @@ class GoogleSheetsForecastUpdater:
 
     def prepare_data(self, csv_file):
         """Read forecast CSV and return values for Sheets API."""
+        import pandas as pd
+
         try:
             logger.info(f"Reading data from {csv_file}...")
             df = pd.read_csv(csv_file)
@@ -93,28 +67,17 @@ class GoogleSheetsForecastUpdater:
             raise
 
     def update_sheet(self, values, sheet_name='Sheet1'):
-        """Update Google Sheet with new data"""
+        """Update Google Sheet with new data in one batchUpdate"""
+        from googleapiclient.errors import HttpError
+
         try:
-            if not self.service:
+            if not self.client:
                 raise ValueError("Not authenticated. Call authenticate() first.")
 
             logger.info(f"Updating sheet {self.spreadsheet_id}...")
-            range_name = f'{sheet_name}!A:Z'
-            self.service.spreadsheets().values().clear(
-                spreadsheetId=self.spreadsheet_id,
-                range=range_name
-            ).execute()
-
-            body = {'values': values}
-            result = self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range=f'{sheet_name}!A1',
-                valueInputOption='RAW',
-                body=body
-            ).execute()
-
-            updated_cells = result.get('updatedCells', 0)
-            logger.info(f"✅ Successfully updated {updated_cells} cells")
+            result = self.client.publish(self.spreadsheet_id, values, sheet_name=sheet_name)
+
+            logger.info(f"✅ Successfully updated {result['updatedCells']} cells")
             return result
 
         except HttpError as e:
@@ -149,4 +112,6 @@ def main():
 
 
 if __name__ == "__main__":
+    setup_logging("google_sheets_forecast_updater.log")
     main()
+    write_report("forecast_sheets_report.json")
@@ -5,37 +5,24 @@ Uploads Colorado resort data to Google Sheets for Datawrapper integration
 """
 
 import os
-import json
 import logging
-import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from sheets_client import get_sheets_client
+from source_cache import format_age
+from log_setup import setup_logging
+from run_report import write_report
 
 # Load environment variables
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("google_sheets_updater.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 # Configuration
 SPREADSHEET_ID = os.environ.get("GOOGLE_SHEETS_SPREADSHEET_ID")
 CREDENTIALS_JSON = os.environ.get("GOOGLE_CREDENTIALS")  # JSON string from GitHub secrets
 
-# Google Sheets API scopes
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-
 
 class GoogleSheetsUpdater:
     """Handles updating Google Sheets with Colorado resort data"""
@@ -43,6 +30,7 @@ class GoogleSheetsUpdater:
     def __init__(self, spreadsheet_id=None, credentials_json=None):
         self.spreadsheet_id = spreadsheet_id or SPREADSHEET_ID
         self.credentials_json = credentials_json or CREDENTIALS_JSON
+        self.client = None
         self.service = None
         
         if not self.spreadsheet_id:
@@ -65,37 +53,9 @@ class GoogleSheetsUpdater:
         try:
             logger.info("Authenticating with Google Sheets API...")
             
-            # Parse credentials JSON
-            if isinstance(self.credentials_json, str):
-                # Clean up the JSON string (remove extra quotes, whitespace, newlines)
-                cleaned = self.credentials_json.strip()
-                
-                # Remove surrounding quotes if present (common when pasting into GitHub secrets)
-                if cleaned.startswith("'") and cleaned.endswith("'"):
-                    cleaned = cleaned[1:-1]
-                if cleaned.startswith('"') and cleaned.endswith('"'):
-                    cleaned = cleaned[1:-1]
-                
-                # Log the first few characters for debugging (don't log the whole thing!)
-                logger.info(f"Parsing credentials JSON (starts with: {cleaned[:50]}...)")
-                
-                try:
-                    credentials_dict = json.loads(cleaned)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON. Length: {len(cleaned)}, First 100 chars: {cleaned[:100]}")
-                    logger.error(f"JSON error: {e}")
-                    raise
-            else:
-                credentials_dict = self.credentials_json
-            
-            # Create credentials
-            credentials = service_account.Credentials.from_service_account_info(
-                credentials_dict,
-                scopes=SCOPES
-            )
-            
-            # Build the service
-            self.service = build('sheets', 'v4', credentials=credentials)
+            # One client per service account in this process
+            self.client = get_sheets_client(self.credentials_json)
+            self.service = self.client.service
             logger.info("✅ Successfully authenticated with Google Sheets API")
             return True
             
@@ -103,11 +63,16 @@ class GoogleSheetsUpdater:
             logger.error(f"❌ Failed to authenticate: {e}")
             raise
     
-    def prepare_data(self, csv_file):
-        """Read and prepare data from CSV file"""
+    def prepare_data(self, source):
+        """Prepare sheet values from a combined DataFrame or its CSV file"""
+        import pandas as pd
+        
         try:
-            logger.info(f"Reading data from {csv_file}...")
-            df = pd.read_csv(csv_file)
+            if isinstance(source, pd.DataFrame):
+                df = source
+            else:
+                logger.info(f"Reading data from {source}...")
+                df = pd.read_csv(source)
             
             # Select and rename columns for Google Sheets
             # Include all useful data for Datawrapper Symbol Map
@@ -122,6 +87,19 @@ class GoogleSheetsUpdater:
                 except:
                     return 0
             
+            # Rows merged from a cached source (stale_age_min set by
+            # mark_stale) keep the time they were scraped and say so in
+            # Data Source; fresh rows are stamped now
+            now = datetime.now(ZoneInfo('America/Denver'))
+            age_min = pd.to_numeric(df.get('stale_age_min', pd.Series(index=df.index, dtype=float)),
+                                    errors='coerce')
+            stale = age_min.notna()
+            source = df.get('source', pd.Series('', index=df.index)).fillna('').astype(str)
+            source[stale] = [f"{label} (cached {format_age(minutes * 60)} ago)"
+                             for label, minutes in zip(source[stale], age_min[stale])]
+            last_updated = [(now - timedelta(minutes=minutes)).strftime('%Y-%m-%d %H:%M') if pd.notna(minutes)
+                            else now.strftime('%Y-%m-%d %H:%M') for minutes in age_min]
+
             sheet_data = pd.DataFrame({
                 'Resort Name': df['name'],
                 'Latitude': df.get('latitude', df.get('lat', '')),
@@ -138,8 +116,8 @@ class GoogleSheetsUpdater:
                 'Total Lifts': df.get('total_lifts', 0),
                 'Open Lifts': df.get('open_lifts', 0),
                 'Lifts Open %': df.get('lifts_open_pct', 0),
-                'Data Source': df.get('source', ''),
-                'Last Updated': datetime.now(ZoneInfo('America/Denver')).strftime('%Y-%m-%d %H:%M')
+                'Data Source': source,
+                'Last Updated': last_updated,
             })
             
             # Convert to list of lists for Sheets API
@@ -154,38 +132,23 @@ class GoogleSheetsUpdater:
             raise
     
     def update_sheet(self, values, sheet_name='Sheet1'):
-        """Update Google Sheet with new data"""
+        """Update Google Sheet with new data and formatting in one batchUpdate"""
+        from googleapiclient.errors import HttpError
+        
         try:
-            if not self.service:
+            if not self.client:
                 raise ValueError("Not authenticated. Call authenticate() first.")
             
             logger.info(f"Updating sheet {self.spreadsheet_id}...")
             
-            # Clear existing data
-            range_name = f'{sheet_name}!A:Z'
-            logger.info(f"Clearing range {range_name}...")
-            
-            self.service.spreadsheets().values().clear(
-                spreadsheetId=self.spreadsheet_id,
-                range=range_name
-            ).execute()
-            
-            # Write new data
-            logger.info(f"Writing {len(values)} rows...")
-            
-            body = {
-                'values': values
-            }
-            
-            result = self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range=f'{sheet_name}!A1',
-                valueInputOption='RAW',
-                body=body
-            ).execute()
+            result = self.client.publish(
+                self.spreadsheet_id,
+                values,
+                sheet_name=sheet_name,
+                format_requests=self.format_requests,
+            )
             
-            updated_cells = result.get('updatedCells', 0)
-            logger.info(f"✅ Successfully updated {updated_cells} cells")
+            logger.info(f"✅ Successfully updated {result['updatedCells']} cells")
             
             return result
             
@@ -196,62 +159,61 @@ class GoogleSheetsUpdater:
             logger.error(f"❌ Failed to update sheet: {e}")
             raise
     
-    def format_sheet(self, sheet_name='Sheet1'):
-        """Apply formatting to make the sheet look nice"""
-        try:
-            logger.info("Applying formatting...")
-            
-            requests = [
-                # Freeze header row
-                {
-                    'updateSheetProperties': {
-                        'properties': {
-                            'sheetId': 0,
-                            'gridProperties': {
-                                'frozenRowCount': 1
-                            }
-                        },
-                        'fields': 'gridProperties.frozenRowCount'
-                    }
-                },
-                # Bold header row
-                {
-                    'repeatCell': {
-                        'range': {
-                            'sheetId': 0,
-                            'startRowIndex': 0,
-                            'endRowIndex': 1
-                        },
-                        'cell': {
-                            'userEnteredFormat': {
-                                'textFormat': {
-                                    'bold': True
-                                }
+    def format_requests(self, sheet_id=0):
+        """batchUpdate requests that make the sheet look nice"""
+        return [
+            # Freeze header row
+            {
+                'updateSheetProperties': {
+                    'properties': {
+                        'sheetId': sheet_id,
+                        'gridProperties': {
+                            'frozenRowCount': 1
+                        }
+                    },
+                    'fields': 'gridProperties.frozenRowCount'
+                }
+            },
+            # Bold header row
+            {
+                'repeatCell': {
+                    'range': {
+                        'sheetId': sheet_id,
+                        'startRowIndex': 0,
+                        'endRowIndex': 1
+                    },
+                    'cell': {
+                        'userEnteredFormat': {
+                            'textFormat': {
+                                'bold': True
                             }
-                        },
-                        'fields': 'userEnteredFormat.textFormat.bold'
-                    }
-                },
-                # Auto-resize columns
-                {
-                    'autoResizeDimensions': {
-                        'dimensions': {
-                            'sheetId': 0,
-                            'dimension': 'COLUMNS',
-                            'startIndex': 0,
-                            'endIndex': 9
                         }
+                    },
+                    'fields': 'userEnteredFormat.textFormat.bold'
+                }
+            },
+            # Auto-resize columns
+            {
+                'autoResizeDimensions': {
+                    'dimensions': {
+                        'sheetId': sheet_id,
+                        'dimension': 'COLUMNS',
+                        'startIndex': 0,
+                        'endIndex': 9
                     }
                 }
-            ]
-            
-            body = {
-                'requests': requests
             }
+        ]
+    
+    def format_sheet(self, sheet_name='Sheet1'):
+        """Apply formatting on its own (update_sheet() already includes it)"""
+        try:
+            logger.info("Applying formatting...")
             
+            sheet_id, _ = self.client.sheet_properties(self.spreadsheet_id, sheet_name)
             self.service.spreadsheets().batchUpdate(
                 spreadsheetId=self.spreadsheet_id,
-                body=body
+                body={'requests': self.format_requests(sheet_id)}
             ).execute()
             
             logger.info("✅ Formatting applied")
@@ -283,12 +245,9 @@ def main():
         # Prepare data
         values = updater.prepare_data(csv_file)
         
-        # Update sheet
+        # Update sheet (data and formatting in one request)
         updater.update_sheet(values)
         
-        # Apply formatting
-        updater.format_sheet()
-        
         logger.info("="*70)
         logger.info("✅ GOOGLE SHEETS UPDATE COMPLETE!")
         logger.info("="*70)
@@ -300,5 +259,6 @@ def main():
 
 
 if __name__ == "__main__":
+    setup_logging("google_sheets_updater.log")
     main()
-
+    write_report("sheets_report.json")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Session
+Pooled keep-alive requests session with retries, shared by every HTTP fetcher
+so repeated requests to the same host reuse one TCP/TLS connection
+"""
+
+import threading
+from run_report import add_usage
+
+# Same desktop user agent the Selenium scrapers send
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# retries flag -> process-wide session
+_sessions = {}
+_session_lock = threading.Lock()
+
+
+def _count_response(response, *args, **kwargs):
+    """Response hook: charge the (decoded) body to the current run-report span"""
+    add_usage(bytes=len(response.content), requests=1)
+
+
+def build_session(pool_size=10, retries=3, backoff_factor=1.0):
+    """Build a new requests session with connection pooling and retries"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    session.hooks['response'].append(_count_response)
+    return session
+
+
+def get_session(retries=True):
+    """Return the process-wide pooled session, creating it on first use
+
+    retries=False gives a second pooled session without urllib3 retries, for
+    callers that retry on their own within a deadline.
+    """
+    session = _sessions.get(retries)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retries)
+            if session is None:
+                session = _sessions[retries] = build_session(retries=3 if retries else 0)
+    return session
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Logging Setup
+One process-wide logging pipeline for every entry point: loggers only put
+records on a queue, and a single listener thread formats them and writes the
+console, the entry point's log file and each module's own log file, so
+scraper worker threads never wait on disk. Log files can be written as JSON
+lines, and chatty per-resort / per-page lines can be sampled down to counts
+"""
+
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
+# 'text' (default) or 'json' (one JSON object per line in the log files;
+# the console stays human-readable either way)
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()
+
+# Keep 1 in N per-item INFO/DEBUG lines per logger; 1 keeps them all and 0
+# drops them all, leaving only the per-logger counts logged at shutdown.
+# Warnings and errors are never sampled
+LOG_SAMPLE_EVERY = int(os.environ.get('LOG_SAMPLE_EVERY', '1'))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Mark per-resort / per-page records so they can be sampled:
+#     logger.info(f"Fetching {name}...", extra=PER_ITEM)
+PER_ITEM = {'per_item': True}
+
+# Each module's own log file, as the modules used to configure for themselves
+MODULE_LOG_FILES = {
+    'aspen_snowmass_scraper': 'aspen_scraper.log',
+    'colorado_data_fetcher': 'data_fetcher.log',
+    'colorado_ski_scraper': 'colorado_scraper.log',
+    'combined_scraper': 'combined_scraper.log',
+    'google_sheets_forecast_updater': 'google_sheets_forecast_updater.log',
+    'google_sheets_updater': 'google_sheets_updater.log',
+    'onthesnow_scraper': 'onthesnow_scraper.log',
+    'ski_api_fetcher': 'ski_api_fetcher.log',
+    'snow_map': 'snow_map.log',
+    'snow_table': 'snow_table.log',
+}
+
+_listener = None
+_queue_handler = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'per_item', False):
+            entry['per_item'] = True
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class PerItemSampler(logging.Filter):
+    """Keeps the first and then every Nth per-item record per logger
+
+    Runs in the calling thread before the record is queued, so dropped
+    lines cost a counter increment and nothing else.
+    """
+
+    def __init__(self, every=LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.every = every
+        self.seen = {}
+        self.dropped = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.every == 1 or record.levelno >= logging.WARNING or not getattr(record, 'per_item', False):
+            return True
+        with self._lock:
+            count = self.seen.get(record.name, 0)
+            self.seen[record.name] = count + 1
+            keep = self.every > 1 and count % self.every == 0
+            if not keep:
+                self.dropped[record.name] = self.dropped.get(record.name, 0) + 1
+        return keep
+
+    def summary(self):
+        """[(logger name, lines seen, lines dropped)] for loggers that lost lines"""
+        with self._lock:
+            return [(name, self.seen[name], dropped) for name, dropped in sorted(self.dropped.items())]
+
+
+def _file_handler(path, formatter, logger_name=None):
+    # delay=True: a module's file is only created once it has something to say
+    handler = logging.FileHandler(path, delay=True, encoding='utf-8')
+    handler.setFormatter(formatter)
+    if logger_name:
+        handler.addFilter(logging.Filter(logger_name))
+    return handler
+
+
+def setup_logging(log_file=None, level=LOG_LEVEL, log_format=LOG_FORMAT, sample_every=LOG_SAMPLE_EVERY):
+    """Route all logging through one queue and listener thread
+
+    log_file receives every record of the run; records from the modules in
+    MODULE_LOG_FILES also go to that module's file. Safe to call more than
+    once: only the first call in a process configures anything.
+    """
+    global _listener, _queue_handler
+
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        text = logging.Formatter(TEXT_FORMAT)
+        file_formatter = JsonFormatter() if log_format == 'json' else text
+
+        console = logging.StreamHandler()
+        console.setFormatter(text)
+        handlers = [console]
+        if log_file:
+            handlers.append(_file_handler(log_file, file_formatter))
+        for name, path in MODULE_LOG_FILES.items():
+            if path != log_file:
+                handlers.append(_file_handler(path, file_formatter, logger_name=name))
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = QueueHandler(log_queue)
+        _queue_handler.addFilter(PerItemSampler(sample_every))
+
+        root = logging.getLogger()
+        root.addHandler(_queue_handler)
+        root.setLevel(level)
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+class _Relay(logging.Handler):
+    """Hands a child process's records to this process's loggers"""
+
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+
+def forward_records(log_queue):
+    """Parent side of a worker process: replay the records it puts on log_queue
+
+    They go through this process's loggers (sampling, module files and all).
+    Returns the started listener; stop() it once the worker has exited.
+    """
+    listener = QueueListener(log_queue, _Relay())
+    listener.start()
+    return listener
+
+
+def log_to_queue(log_queue):
+    """Worker process side: send every record to the parent's log_queue
+
+    Replaces the handlers inherited on fork, whose listener thread only
+    exists in the parent.
+    """
+    global _listener, _queue_handler
+
+    with _setup_lock:
+        _listener = None
+        _queue_handler = None
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+
+
+def shutdown_logging():
+    """Report sampled-out lines, drain the queue and close the files"""
+    global _listener, _queue_handler
+
+    with _setup_lock:
+        if _listener is None:
+            return
+        for sampler in _queue_handler.filters:
+            for name, seen, dropped in sampler.summary():
+                logging.getLogger(name).info(
+                    f"📉 {dropped} of {seen} per-item lines sampled out (LOG_SAMPLE_EVERY={sampler.every})"
+                )
+
+        _listener.stop()
+        logging.getLogger().removeHandler(_queue_handler)
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
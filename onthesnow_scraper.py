@@ -9,53 +9,114 @@ import os
 import pandas as pd
 import logging
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
+from browser_pool import (BASE_BLOCKED_URLS, apply_resource_blocking, build_chrome_options,
+                          collect_page_stats, wait_until_ready)
 import re
 import json
+import threading
+from contextlib import contextmanager
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from http_session import get_session
+from snapshots import ONTHESNOW_DETAIL, ONTHESNOW_PAGE, has_snapshot, load_snapshot, save_snapshot
+from log_setup import PER_ITEM, setup_logging
+from run_report import in_current_span, span
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("onthesnow_scraper.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+DETAIL_URL = "https://www.onthesnow.com/colorado/{slug}/skireport"
+
+# Detail-page concurrency (overridable from the environment)
+DETAIL_PAGE_WORKERS = int(os.environ.get('DETAIL_PAGE_WORKERS', '8'))
+DETAIL_PER_HOST_LIMIT = int(os.environ.get('DETAIL_PER_HOST_LIMIT', '4'))
+
+NEXT_DATA_MARKER = '<script id="__NEXT_DATA__"'
+
+# Detail-page fields that may carry a surface conditions description
+SURFACE_KEYS = ('surfaceConditions', 'surfaceCondition', 'surface', 'conditions')
+
+# Text fallback for detail pages without usable JSON: one alternation, so the
+# page is scanned once, and the depth must follow its label through tags and
+# whitespace only (no DOTALL backtracking into unrelated numbers)
+DETAIL_TEXT_PATTERN = re.compile(
+    r'(?P<surface>Machine Groomed|Packed Powder|Variable Conditions|Spring Conditions|Hard Pack|Powder|Icy)'
+    r'|(?i:Mid-Mt Depth)(?:\s|<[^>]{0,200}>){0,20}(?P<mid_mtn>[0-9]+)(?:"|&quot;|″)'
+)
+
+# (host, limit) -> semaphore, shared by scrapers using the same limit
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def _host_semaphore(host, limit):
+    """Shared semaphore capping concurrent requests to one host at limit"""
+    with _host_semaphores_lock:
+        key = (host, limit)
+        if key not in _host_semaphores:
+            _host_semaphores[key] = threading.BoundedSemaphore(limit)
+        return _host_semaphores[key]
+
+
+def next_data_ready(driver):
+    """Readiness predicate: the __NEXT_DATA__ script is present"""
+    from selenium.webdriver.common.by import By
+
+    return bool(driver.find_elements(By.ID, '__NEXT_DATA__'))
+
+
+def _extract_next_data(html):
+    """Return the parsed __NEXT_DATA__ JSON, or None if absent/invalid"""
+    start = html.find(NEXT_DATA_MARKER)
+    if start == -1:
+        return None
+    start = html.find('>', start)
+    end = html.find('</script>', start)
+    if start == -1 or end == -1:
+        return None
+    try:
+        return json.loads(html[start + 1:end])
+    except ValueError:
+        return None
+
+
 class OnTheSnowScraper:
     """Scrapes snow conditions from OnTheSnow.com for Colorado using embedded JSON"""
 
-    def __init__(self, headless=True, skip_detail_pages=False):
+    # __NEXT_DATA__ ships in the server-rendered HTML, so the Next.js bundles
+    # can be blocked along with media, fonts, styles and trackers
+    BLOCKED_URLS = BASE_BLOCKED_URLS + ['*/_next/static/*', '*/_next/image*']
+
+    def __init__(self, headless=True, skip_detail_pages=False, use_browser=False,
+                 detail_workers=DETAIL_PAGE_WORKERS, per_host_limit=DETAIL_PER_HOST_LIMIT,
+                 browser_pool=None, replay_dir=None):
         self.url = "https://www.onthesnow.com/colorado/skireport.html"
         self.headless = headless
         self.skip_detail_pages = skip_detail_pages
+        # __NEXT_DATA__ is server-rendered, so plain HTTP is tried first and
+        # Chrome is only started when that payload is missing or invalid
+        self.use_browser = use_browser
+        self.detail_workers = detail_workers
+        self.per_host_limit = per_host_limit
+        self.browser_pool = browser_pool
+        # Read saved snapshots from this directory instead of the network
+        self.replay_dir = replay_dir
         self.driver = None
+        self.time_to_ready = None
     
     def setup_driver(self):
-        """Configure Chrome driver for Selenium"""
-        chrome_options = Options()
-        
-        if self.headless:
-            chrome_options.add_argument("--headless")
-        
-        # Essential options for CI/cloud environments
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
-        
+        """Configure Chrome driver, or borrow a tab from the shared pool"""
+        if self.browser_pool:
+            self.driver = self.browser_pool.acquire_tab()
+            logger.info("Using a tab from the shared Chrome pool")
+            return
+
         # Initialize driver
+        from selenium import webdriver
+
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            with span('chrome.startup'):
+                self.driver = webdriver.Chrome(options=build_chrome_options(self.headless))
             logger.info("Chrome driver initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Chrome driver: {e}")
@@ -65,43 +126,185 @@ class OnTheSnowScraper:
         """Load the page and wait for data to render"""
         target_url = url or self.url
         try:
-            logger.info(f"Loading {target_url}")
-            self.driver.get(target_url)
-            
-            # Wait for the page to load
-            logger.info("Waiting for page to load...")
-            wait = WebDriverWait(self.driver, 30)
-            
-            # Wait for body
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            logger.info("Page body loaded")
-            
-            # Give extra time for dynamic content
-            time.sleep(5)
-            
-            # Get the rendered HTML
-            html = self.driver.page_source
-            logger.info(f"Retrieved {len(html)} bytes of HTML")
-            
+            with span('onthesnow.fetch_page'):
+                logger.info(f"Loading {target_url}")
+                apply_resource_blocking(self.driver, self.BLOCKED_URLS)
+                self.driver.get(target_url)
+
+                # Ready as soon as the __NEXT_DATA__ payload is in the DOM
+                logger.info("Waiting for __NEXT_DATA__...")
+                self.time_to_ready = wait_until_ready(self.driver, next_data_ready)
+
+                # Get the rendered HTML
+                html = self.driver.page_source
+                logger.info(f"Retrieved {len(html)} bytes of HTML")
+                collect_page_stats(self.driver, target_url, self.time_to_ready)
+
             return html
             
         except Exception as e:
             logger.error(f"Error fetching page {target_url}: {e}")
             raise
     
+    def fetch_page_http(self, url=None, timeout=20):
+        """Fetch the raw server-rendered HTML over the shared pooled session"""
+        target_url = url or self.url
+        logger.info(f"Fetching {target_url} over HTTP", extra=PER_ITEM if url else None)
+        response = get_session().get(target_url, timeout=timeout)
+        response.raise_for_status()
+        html = response.text
+        logger.info(f"Retrieved {len(html)} bytes of HTML", extra=PER_ITEM if url else None)
+        return html
+
+    def _fetch_resorts_http(self):
+        """Try the browserless fetch; returns (html, resorts) or (None, [])"""
+        try:
+            html = self.fetch_page_http()
+        except requests.RequestException as e:
+            logger.warning(f"HTTP fetch failed: {e}")
+            return None, []
+
+        resorts = self.parse_json_data(html)
+        if not self._is_valid_payload(resorts):
+            logger.warning("HTTP payload missing or failed validation")
+            return html, []
+        return html, resorts
+
+    def _is_valid_payload(self, resorts):
+        """A usable payload has resorts and at least one with lift totals"""
+        if not resorts:
+            return False
+        return any(r.get('total_lifts', 0) > 0 for r in resorts)
+
+    def fetch_details(self, slugs):
+        """Fetch detail pages concurrently and return {slug: details}"""
+        if self.replay_dir:
+            # Only pages captured in the original run can be replayed
+            slugs = [slug for slug in slugs
+                     if has_snapshot(self.replay_dir, ONTHESNOW_DETAIL.format(slug=slug))]
+
+        if not slugs:
+            return {}
+
+        with span('onthesnow.detail_pages') as detail_span:
+            logger.info(f"Fetching {len(slugs)} detail pages "
+                        f"({self.detail_workers} workers, {self.per_host_limit} per host)...")
+            details = {}
+            failed = []
+
+            with ThreadPoolExecutor(max_workers=self.detail_workers) as executor:
+                futures = {executor.submit(in_current_span(self._fetch_detail), slug): slug for slug in slugs}
+                for future in as_completed(futures):
+                    slug = futures[future]
+                    try:
+                        details[slug] = future.result()
+                    except Exception as e:
+                        logger.warning(f"Failed to get details for {slug}: {e}")
+                        failed.append(slug)
+
+            # Chrome is single-threaded, so any leftovers are retried one by one
+            if failed and not self.replay_dir and (self.driver or self.browser_pool):
+                logger.info(f"Retrying {len(failed)} detail pages in Chrome...")
+                with self._detail_driver() as driver:
+                    apply_resource_blocking(driver, self.BLOCKED_URLS)
+                    for slug in failed:
+                        try:
+                            driver.get(DETAIL_URL.format(slug=slug))
+                            wait_until_ready(driver, next_data_ready, timeout=15)
+                            detail_html = driver.page_source
+                            save_snapshot(ONTHESNOW_DETAIL.format(slug=slug), detail_html)
+                            details[slug] = self.parse_detail_html(detail_html)
+                        except Exception as e:
+                            logger.warning(f"Failed to get details for {slug} in Chrome: {e}")
+
+            logger.info(f"Got details for {len(details)}/{len(slugs)} resorts")
+            detail_span.set(rows=len(details), failed=len(slugs) - len(details))
+        return details
+
+    @contextmanager
+    def _detail_driver(self):
+        """The scraper's own driver if running, else a tab from the pool"""
+        if self.driver:
+            yield self.driver
+        else:
+            with self.browser_pool.tab() as driver:
+                yield driver
+
+    def _fetch_detail(self, slug):
+        """Fetch (or replay) and parse one detail page, honouring the per-host limit"""
+        snapshot_name = ONTHESNOW_DETAIL.format(slug=slug)
+        if self.replay_dir:
+            return self.parse_detail_html(load_snapshot(self.replay_dir, snapshot_name))
+
+        url = DETAIL_URL.format(slug=slug)
+        with _host_semaphore(urlparse(url).netloc, self.per_host_limit):
+            html = self.fetch_page_http(url)
+        save_snapshot(snapshot_name, html)
+        return self.parse_detail_html(html)
+
+    def parse_detail_html(self, detail_html):
+        """Extract surface conditions and mid-mountain depth from a detail page
+
+        Values come from the embedded __NEXT_DATA__ resort record; the text
+        matcher only fills in fields the JSON doesn't carry.
+        """
+        details = {'surface_conditions': '-', 'mid_mtn_depth': 0}
+        middle = None
+
+        resort_json = self._find_detail_resort(_extract_next_data(detail_html))
+        if resort_json:
+            middle = (resort_json.get('snow') or {}).get('middle')
+            if middle is not None:
+                details['mid_mtn_depth'] = round(float(middle) / 2.54)
+            for key in SURFACE_KEYS:
+                value = resort_json.get(key)
+                if isinstance(value, str) and value.strip():
+                    details['surface_conditions'] = value.strip()
+                    break
+            if details['surface_conditions'] != '-' and middle is not None:
+                return details
+
+        # Single bounded pass over the HTML for whatever is still missing
+        surface, mid_mtn = None, None
+        for match in DETAIL_TEXT_PATTERN.finditer(detail_html):
+            if surface is None and match.group('surface'):
+                surface = match.group('surface')
+            elif mid_mtn is None and match.group('mid_mtn'):
+                mid_mtn = int(match.group('mid_mtn'))
+            if surface is not None and mid_mtn is not None:
+                break
+
+        if details['surface_conditions'] == '-' and surface:
+            details['surface_conditions'] = surface
+        if middle is None and mid_mtn is not None:
+            details['mid_mtn_depth'] = mid_mtn
+
+        return details
+
+    def _find_detail_resort(self, data):
+        """Locate the resort record (the dict carrying 'snow') in pageProps"""
+        if not data:
+            return None
+        page_props = data.get('props', {}).get('pageProps', {})
+        for key in ('fullResort', 'resort'):
+            if isinstance(page_props.get(key), dict) and 'snow' in page_props[key]:
+                return page_props[key]
+        # Shallow search so one unexpected layout change doesn't lose the data
+        for value in page_props.values():
+            if isinstance(value, dict) and isinstance(value.get('snow'), dict):
+                return value
+        return None
+
     def parse_json_data(self, html):
         """Extract resort data from __NEXT_DATA__ JSON"""
         try:
-            # Find the __NEXT_DATA__ script tag
-            match = re.search(r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', html, re.DOTALL)
+            # Find and parse the __NEXT_DATA__ script tag
+            data = _extract_next_data(html)
             
-            if not match:
+            if data is None:
                 logger.error("Could not find __NEXT_DATA__ in HTML")
                 return []
             
-            # Parse JSON
-            data = json.loads(match.group(1))
-            
             # Navigate to resorts data
             try:
                 resorts_data = data['props']['pageProps']['resorts']
@@ -186,14 +389,20 @@ class OnTheSnowScraper:
     def scrape(self):
         """Main scraping method"""
         try:
-            self.setup_driver()
-            html = self.fetch_page()
-            
-            # Save HTML for debugging
-            with open('onthesnow_page_rendered.html', 'w', encoding='utf-8') as f:
-                f.write(html)
-            
-            resorts = self.parse_json_data(html)
+            if self.replay_dir:
+                html = load_snapshot(self.replay_dir, ONTHESNOW_PAGE)
+                resorts = self.parse_json_data(html)
+            else:
+                html, resorts = (None, []) if self.use_browser else self._fetch_resorts_http()
+
+                if not resorts:
+                    logger.info("Falling back to Chrome for OnTheSnow")
+                    self.setup_driver()
+                    html = self.fetch_page()
+                    resorts = self.parse_json_data(html)
+                
+                # Save HTML for debugging and replay
+                save_snapshot(ONTHESNOW_PAGE, html)
             
             if not resorts:
                 logger.warning("No resort data found!")
@@ -216,40 +425,18 @@ class OnTheSnowScraper:
                 df['mid_mtn_depth'] = 0
                 return df
 
-            open_resorts = df[df['status'] == 'Open'].copy()
-            logger.info(f"Visiting individual pages for {len(open_resorts)} open resorts for extra detail...")
-            
-            for idx, row in open_resorts.iterrows():
-                if row['slug']:
-                    try:
-                        detail_url = f"https://www.onthesnow.com/colorado/{row['slug']}/skireport"
-                        logger.info(f"  -> Detail: {row['name']} ({detail_url})")
-                        
-                        self.driver.get(detail_url)
-                        time.sleep(2) # Reduced sleep for faster execution
-                        
-                        detail_html = self.driver.page_source
-                        
-                        # Look for Surface Conditions text
-                        # It often appears in a cell with "Machine Groomed", "Powder", etc.
-                        # We'll use a simple regex search in the HTML for common condition words
-                        conditions = ["Machine Groomed", "Packed Powder", "Powder", "Variable Conditions", "Spring Conditions", "Icy", "Hard Pack"]
-                        found_condition = "-"
-                        for cond in conditions:
-                            if cond in detail_html:
-                                found_condition = cond
-                                break
-                        
-                        df.at[idx, 'surface_conditions'] = found_condition
-                        
-                        # Also look for Mid-Mountain Depth if available
-                        # This is harder to find with simple regex, but let's try
-                        match = re.search(r'Mid-Mt Depth.*?([0-9]+)"', detail_html, re.DOTALL | re.IGNORECASE)
-                        if match:
-                            df.at[idx, 'mid_mtn_depth'] = int(match.group(1))
-                        
-                    except Exception as e:
-                        logger.warning(f"Failed to get details for {row['name']}: {e}")
+            df['surface_conditions'] = '-'
+            df['mid_mtn_depth'] = 0
+
+            open_slugs = [slug for slug in df.loc[df['status'] == 'Open', 'slug'] if slug]
+            details = self.fetch_details(open_slugs)
+
+            # Merge detail results back by slug
+            if details:
+                surface = df['slug'].map(lambda slug: details.get(slug, {}).get('surface_conditions'))
+                mid_mtn = df['slug'].map(lambda slug: details.get(slug, {}).get('mid_mtn_depth'))
+                df['surface_conditions'] = surface.fillna(df['surface_conditions'])
+                df['mid_mtn_depth'] = mid_mtn.fillna(df['mid_mtn_depth']).astype(int)
             
             # Sort by name
             df = df.sort_values('name').reset_index(drop=True)
@@ -262,7 +449,10 @@ class OnTheSnowScraper:
     
     def cleanup(self):
         """Clean up resources"""
-        if self.driver:
+        if self.driver and self.browser_pool:
+            self.browser_pool.release_tab()
+            self.driver = None
+        elif self.driver:
             try:
                 self.driver.quit()
                 logger.info("Chrome driver closed")
@@ -300,4 +490,5 @@ def main():
 
 
 if __name__ == "__main__":
+    setup_logging("onthesnow_scraper.log")
     main()
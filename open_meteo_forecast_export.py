@@ -5,13 +5,14 @@ using Open-Meteo daily snowfall sums.
 """
 
 import os
-from datetime import datetime
+import sys
+from datetime import datetime, timezone
 
-import pandas as pd
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from combined_scraper import RESORT_DATA
+from forecast_cache import ForecastCache, cache_key
+from http_session import get_session
+from resort_registry import get_registry
+from profiling import profiled
+from run_report import current_span, span, timed, write_report
 
 
 CALIFORNIA_CSV = "california_resorts_combined.csv"
@@ -19,6 +20,7 @@ COLORADO_CSV = "colorado_resorts_combined.csv"
 
 OUTPUT_CA = "california_snow_forecast.csv"
 OUTPUT_CO = "colorado_snow_forecast.csv"
+RUN_REPORT_FILE = "forecast_report.json"
 
 
 DAILY_VARS = [
@@ -27,8 +29,36 @@ DAILY_VARS = [
 
 FORECAST_DAYS = 5
 
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+
+# Locations per multi-coordinate request (comma-separated lat/lon lists)
+BATCH_SIZE = int(os.environ.get("OPEN_METEO_BATCH_SIZE", "100"))
+
+# Forecast model sent as models=; empty keeps Open-Meteo's "best match",
+# which over Colorado serves HRRR (~3 km) for the first two days and GFS
+# beyond. Set it together with OPEN_METEO_MODEL_META_URL and FORECAST_GRID_DEG
+FORECAST_MODEL = os.environ.get("OPEN_METEO_MODEL", "")
+
+# Run metadata of the models behind FORECAST_MODEL (comma-separated); a new
+# run of any of them invalidates cached forecasts
+MODEL_META_URL = os.environ.get(
+    "OPEN_METEO_MODEL_META_URL",
+    "https://api.open-meteo.com/data/ncep_hrrr_conus/static/meta.json,"
+    "https://api.open-meteo.com/data/ncep_gfs013/static/meta.json",
+)
+
+# Model grid spacing in degrees (~2.5 km, the HRRR/ICON-D2 class of models
+# Open-Meteo serves for the US); resorts snapping to the same cell get the
+# same forecast, so each cell is fetched once. 0 disables deduplication.
+GRID_RESOLUTION = float(os.environ.get("FORECAST_GRID_DEG", "0.025"))
+
+# Ignore cached payloads and refetch everything (or pass --force-refresh)
+FORCE_REFRESH = os.environ.get("FORECAST_FORCE_REFRESH", "").lower() in {"1", "true", "yes"}
+
 
 def _load_resorts(csv_path, state_label):
+    import pandas as pd
+
     if os.path.exists(csv_path):
         df = pd.read_csv(csv_path)
         df = df.rename(columns={"latitude": "Latitude", "longitude": "Longitude"})
@@ -37,39 +67,119 @@ def _load_resorts(csv_path, state_label):
         return df[["name", "Latitude", "Longitude", "State"]]
 
     if state_label == "CO":
-        fallback_rows = [
-            {"name": name, "Latitude": data["lat"], "Longitude": data["lng"], "State": "CO"}
-            for name, data in RESORT_DATA.items()
-        ]
-        return pd.DataFrame(fallback_rows)
+        names, lats, lngs = get_registry().coordinates("CO")
+        return pd.DataFrame({"name": names, "Latitude": lats, "Longitude": lngs, "State": "CO"})
 
     raise FileNotFoundError(f"Missing resort CSV: {csv_path}")
 
 
-def _fetch_open_meteo_daily(lat, lon):
-    session = requests.Session()
-    retries = Retry(
-        total=3,
-        backoff_factor=1.5,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"],
-        raise_on_status=False,
-    )
-    session.mount("https://", HTTPAdapter(max_retries=retries))
+def _fetch_open_meteo_batch(lats, lons):
+    """Daily forecasts for several locations in one request, in input order"""
     params = {
-        "latitude": lat,
-        "longitude": lon,
+        "latitude": ",".join(f"{lat:.4f}" for lat in lats),
+        "longitude": ",".join(f"{lon:.4f}" for lon in lons),
         "daily": ",".join(DAILY_VARS),
         "forecast_days": FORECAST_DAYS,
         "timezone": "auto",
     }
-    resp = session.get("https://api.open-meteo.com/v1/forecast", params=params, timeout=60)
+    if FORECAST_MODEL:
+        params["models"] = FORECAST_MODEL
+    resp = get_session().get(OPEN_METEO_URL, params=params, timeout=60)
     resp.raise_for_status()
-    return resp.json()
+    payload = resp.json()
+    # A single location comes back as an object, several as a list
+    payloads = payload if isinstance(payload, list) else [payload]
+    if len(payloads) != len(lats):
+        raise ValueError(f"Open-Meteo returned {len(payloads)} locations for {len(lats)} requested")
+    return payloads
+
+
+def _fetch_model_run():
+    """Latest run of each model in MODEL_META_URL joined by '+', or None if any is unknown"""
+    import requests
+
+    runs = []
+    for url in (u.strip() for u in MODEL_META_URL.split(",") if u.strip()):
+        try:
+            resp = get_session().get(url, timeout=15)
+            resp.raise_for_status()
+            initialised = resp.json()["last_run_initialisation_time"]
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print(f"Could not read model run metadata from {url}: {e}")
+            return None
+        runs.append(datetime.fromtimestamp(initialised, tz=timezone.utc).strftime("%Y-%m-%dT%H:%MZ"))
+    return "+".join(runs) or None
+
+
+def _fetch_forecasts(lats, lons, cache=None):
+    """Payload per location, batched; locations in a failed batch get {}
+
+    Locations with a payload cached for the current model run aren't requested.
+    """
+    import requests
+
+    payloads = [None] * len(lats)
+    keys = [cache_key(lat, lon, DAILY_VARS, FORECAST_DAYS, FORECAST_MODEL or None) for lat, lon in zip(lats, lons)]
+    if cache is not None:
+        payloads = [cache.get(key) for key in keys]
+    missing = [idx for idx, payload in enumerate(payloads) if payload is None]
+
+    for start in range(0, len(missing), BATCH_SIZE):
+        batch = missing[start:start + BATCH_SIZE]
+        try:
+            fetched = _fetch_open_meteo_batch([lats[i] for i in batch], [lons[i] for i in batch])
+        except (requests.RequestException, ValueError) as e:
+            print(f"Forecast batch of {len(batch)} locations failed: {e}")
+            fetched = [{} for _ in batch]
+        for idx, payload in zip(batch, fetched):
+            payloads[idx] = payload
+            if cache is not None and payload:
+                cache.put(keys[idx], payload)
+    return payloads
+
+
+def _grid_cells(lats, lons, resolution=GRID_RESOLUTION):
+    """Representative location per unique grid cell and each location's cell index
+
+    Returns (first, inverse): indices of one location per cell, and for every
+    location the position of its cell in first.
+    """
+    import numpy as np
+
+    if resolution <= 0 or len(lats) == 0:
+        index = np.arange(len(lats))
+        return index, index
+    cells = np.stack([np.round(lats / resolution), np.round(lons / resolution)], axis=1).astype(np.int64)
+    _, first, inverse = np.unique(cells, axis=0, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
 
 
 def _cm_to_inches(values):
-    return [round(float(value) / 2.54, 2) for value in values]
+    import numpy as np
+
+    return np.round(np.asarray(values, dtype=float) / 2.54, 2)
+
+
+def _snowfall_matrix(payloads):
+    """Stack daily snowfall (cm) into a location x day array, zero-padded"""
+    import numpy as np
+
+    matrix = np.zeros((len(payloads), FORECAST_DAYS))
+    for idx, payload in enumerate(payloads):
+        values = (payload.get("daily") or {}).get("snowfall_sum") or []
+        values = values[:FORECAST_DAYS]
+        matrix[idx, :len(values)] = np.array(values, dtype=float)
+    # Open-Meteo reports missing days as null
+    return np.nan_to_num(matrix, nan=0.0)
+
+
+def _date_headers(payloads):
+    """Date column labels from the first payload that has them"""
+    for payload in payloads:
+        times = (payload.get("daily") or {}).get("time")
+        if times:
+            return _format_date_labels(times[:FORECAST_DAYS])
+    return []
 
 
 def _format_date_labels(date_strings):
@@ -83,57 +193,48 @@ def _format_date_labels(date_strings):
     return labels
 
 
-def _build_rows(resorts_df):
-    rows = []
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    date_headers = None
+@timed('build_rows')
+def _build_rows(resorts_df, summary=None, cache=None):
+    import numpy as np
+    import pandas as pd
 
-    for _, row in resorts_df.iterrows():
-        name = str(row["name"])
-        lat = float(row["Latitude"])
-        lon = float(row["Longitude"])
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        try:
-            payload = _fetch_open_meteo_daily(lat, lon)
-            daily = payload.get("daily", {})
-            snowfall_cm = daily.get("snowfall_sum", []) or []
-            if date_headers is None:
-                date_headers = _format_date_labels(daily.get("time", [])[:FORECAST_DAYS])
-        except requests.RequestException:
-            snowfall_cm = []
-
-        snowfall_in = _cm_to_inches(snowfall_cm[:FORECAST_DAYS]) if snowfall_cm else []
-        while len(snowfall_in) < FORECAST_DAYS:
-            snowfall_in.append(0.0)
-
-        total_5day = round(sum(snowfall_in), 2)
-        days_with_snow = sum(1 for val in snowfall_in if val > 0)
-
-        row_data = {
-            "Resort": name,
-            "Five-day total": total_5day,
-            "Forecasted snowfall days": days_with_snow,
-            "Last_Updated": timestamp,
-        }
-
-        if date_headers:
-            for idx, label in enumerate(date_headers):
-                row_data[label] = snowfall_in[idx]
-        else:
-            for idx in range(FORECAST_DAYS):
-                row_data[f"Day{idx+1}"] = snowfall_in[idx]
-
-        rows.append(row_data)
+    lats = resorts_df["Latitude"].to_numpy(dtype=float)
+    lons = resorts_df["Longitude"].to_numpy(dtype=float)
+    first, inverse = _grid_cells(lats, lons)
+    with span('open_meteo.fetch', rows=len(first)):
+        cell_payloads = _fetch_forecasts(lats[first].tolist(), lons[first].tolist(), cache)
+
+    if summary is not None:
+        summary.update({
+            "resorts": len(resorts_df),
+            "cells": len(first),
+            "deduplicated": len(resorts_df) - len(first),
+        })
+
+    # resort x day inches, fanned out from the per-cell array
+    snowfall_in = _cm_to_inches(_snowfall_matrix(cell_payloads))[inverse]
+    totals = np.round(snowfall_in.sum(axis=1), 2)
+    days_with_snow = (snowfall_in > 0).sum(axis=1)
+
+    date_headers = _date_headers(cell_payloads)
+    summary_columns = {
+        "Five-day total": totals,
+        "Forecasted snowfall days": days_with_snow,
+        "Last_Updated": timestamp,
+    }
+    names = resorts_df["name"].astype(str).to_numpy()
 
     if date_headers:
-        ordered_columns = (
-            ["Resort"]
-            + date_headers
-            + ["Five-day total", "Forecasted snowfall days", "Last_Updated"]
-        )
-        return pd.DataFrame(rows)[ordered_columns]
+        day_columns = dict(zip(date_headers, snowfall_in.T))
+        df = pd.DataFrame({"Resort": names, **day_columns, **summary_columns})
+    else:
+        day_columns = {f"Day{idx+1}": snowfall_in[:, idx] for idx in range(FORECAST_DAYS)}
+        df = pd.DataFrame({"Resort": names, **summary_columns, **day_columns})
 
-    return pd.DataFrame(rows)
+    current_span().set(rows=len(df))
+    return df
 
 
 def _write_csv(df, output_path):
@@ -141,20 +242,49 @@ def _write_csv(df, output_path):
     print(f"Saved {output_path} ({len(df)} rows)")
 
 
+@profiled("open_meteo_forecast_export")
 def main():
     run_ca = os.environ.get("RUN_CA", "").lower() in {"1", "true", "yes"}
     run_co = os.environ.get("RUN_CO", "true").lower() in {"1", "true", "yes"}
 
+    force_refresh = FORCE_REFRESH or "--force-refresh" in sys.argv
+    with span('open_meteo.model_run'):
+        model_run = _fetch_model_run()
+    cache = ForecastCache(model_run=model_run, force_refresh=force_refresh)
+    summaries = {}
+
     if run_ca and os.path.exists(CALIFORNIA_CSV):
         ca_resorts = _load_resorts(CALIFORNIA_CSV, "CA")
-        ca_df = _build_rows(ca_resorts)
+        ca_df = _build_rows(ca_resorts, summaries.setdefault("CA", {}), cache)
         _write_csv(ca_df, OUTPUT_CA)
 
     if run_co:
         co_resorts = _load_resorts(COLORADO_CSV, "CO")
-        co_df = _build_rows(co_resorts)
+        co_df = _build_rows(co_resorts, summaries.setdefault("CO", {}), cache)
         _write_csv(co_df, OUTPUT_CO)
 
+    cache.save()
+    _print_summary(summaries, cache.freshness())
+    print(f"Run report: {write_report(RUN_REPORT_FILE)}")
+
+
+def _print_summary(summaries, freshness):
+    print("Forecast run summary")
+    for state, summary in summaries.items():
+        print(
+            f"  {state}: {summary['resorts']} resorts in {summary['cells']} grid cells "
+            f"({summary['deduplicated']} deduplicated at {GRID_RESOLUTION} deg)"
+        )
+
+    model_run = freshness["model_run"] or "unknown (age-based expiry)"
+    oldest = freshness["oldest_served_age_s"]
+    print(f"  Model run: {model_run}{' [forced refresh]' if freshness['force_refresh'] else ''}")
+    print(
+        f"  Cache: {freshness['cached']} cells served from cache"
+        + (f" (oldest {oldest // 60} min)" if oldest is not None else "")
+        + f", {freshness['fetched']} fetched"
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+On-Demand Profiling
+PROFILE=cprofile and/or sample (or --profile[=...] on the command line) wraps
+a pipeline stage in cProfile, covering the worker threads it starts, or in a
+stack sampler, plus tracemalloc; pstats, flamegraph-ready collapsed stacks
+and peak-memory figures land in PROFILE_DIR for the workflow artifacts
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from run_report import current_span
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated profilers: 'cprofile' (deterministic, writes .pstats and a
+# top-functions .txt) and/or 'sample' (stack sampler, writes .collapsed for
+# flamegraph.pl / speedscope). Unset = no profiling
+PROFILE = os.environ.get('PROFILE', '')
+
+# Only profile these stages (comma-separated names, e.g. scrape_stage);
+# unset = every stage that supports profiling
+PROFILE_STAGE = os.environ.get('PROFILE_STAGE', '')
+
+# Output directory, uploaded as a workflow artifact
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+
+# Stack sampler interval in seconds
+SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', '0.005'))
+
+# Allocation sites listed in the memory report
+MEMORY_TOP = 25
+
+PROFILERS = ('cprofile', 'sample')
+
+_active = threading.Lock()
+
+# From 3.12 cProfile sits on sys.monitoring: one Profile sees every thread and
+# a second one can't be enabled while it runs
+PROCESS_WIDE_CPROFILE = sys.version_info >= (3, 12)
+
+
+def requested_profilers(argv=None):
+    """Profilers asked for by PROFILE or --profile[=cprofile,sample]"""
+    argv = sys.argv if argv is None else argv
+    value = PROFILE
+    for arg in argv[1:]:
+        if arg == '--profile':
+            value = value or 'cprofile,sample'
+        elif arg.startswith('--profile='):
+            value = arg.split('=', 1)[1]
+    if value.lower() in ('1', 'true', 'yes', 'all'):
+        return list(PROFILERS)
+    return [p for p in (v.strip().lower() for v in value.split(',')) if p in PROFILERS]
+
+
+def _stage_selected(name):
+    stages = [s.strip() for s in PROFILE_STAGE.split(',') if s.strip()]
+    return not stages or name in stages
+
+
+class _ThreadProfiles:
+    """cProfile for the calling thread and every thread started meanwhile
+
+    Before 3.12 cProfile only sees the thread that enabled it, so
+    threading.setprofile hands each new thread (scraper pools, detail-page
+    workers) its own profiler; their stats are merged into one pstats file.
+    From 3.12 the main profiler already covers every thread.
+    """
+
+    def __init__(self, per_thread=None):
+        import cProfile
+
+        self._profile_class = cProfile.Profile
+        self.main = cProfile.Profile()
+        self.per_thread = not PROCESS_WIDE_CPROFILE if per_thread is None else per_thread
+        self.threads = []
+        self._lock = threading.Lock()
+
+    def _start_in_thread(self, *args):
+        sys.setprofile(None)
+        profile = self._profile_class()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler owns the process; never take the thread down
+            return
+        with self._lock:
+            self.threads.append(profile)
+
+    def start(self):
+        if self.per_thread:
+            threading.setprofile(self._start_in_thread)
+        self.main.enable()
+
+    def stop(self):
+        self.main.disable()
+        if self.per_thread:
+            threading.setprofile(None)
+
+    def stats(self):
+        import pstats
+
+        stats = pstats.Stats(self.main)
+        with self._lock:
+            for profile in self.threads:
+                # Snapshot without disabling: the thread may still be running
+                stats.add(_Snapshot(profile))
+        return stats
+
+
+class _Snapshot:
+    """pstats input for a profiler owned by another thread"""
+
+    def __init__(self, profile):
+        profile.snapshot_stats()
+        self.stats = profile.stats
+
+    def create_stats(self):
+        pass
+
+
+class StackSampler:
+    """Samples every thread's Python stack on a background thread
+
+    Writes collapsed stacks ("thread;module:function;... count"), the input
+    format of flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                    stack.append(f"{module}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                key = ';'.join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+
+def _memory_report(snapshot, peak, wall_s):
+    report = {
+        'wall_s': round(wall_s, 3),
+        'peak_traced_mb': round(peak / 2**20, 2),
+        'top_allocations': [
+            {'site': str(stat.traceback), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+            for stat in snapshot.statistics('lineno')[:MEMORY_TOP]
+        ],
+    }
+    try:
+        import resource
+        # ru_maxrss is in KB on Linux
+        report['max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    except ImportError:
+        pass
+    return report
+
+
+@contextmanager
+def profiled(name, profilers=None, directory=None):
+    """Profile the enclosed block (or decorated function) when requested
+
+    A no-op unless PROFILE/--profile asks for a profiler and PROFILE_STAGE
+    (if set) includes name. Writes <name>.pstats and <name>_top.txt
+    (cprofile), <name>.collapsed (sample) and <name>_memory.json. Nested
+    profiled() blocks run unprofiled inside the outer one.
+    """
+    profilers = requested_profilers() if profilers is None else profilers
+    if not profilers or not _stage_selected(name) or not _active.acquire(blocking=False):
+        yield
+        return
+
+    import tracemalloc
+
+    directory = directory or PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, name)
+    logger.info(f"🔬 Profiling {name} ({', '.join(profilers)}) into {directory}/")
+
+    cprofile = _ThreadProfiles() if 'cprofile' in profilers else None
+    sampler = StackSampler() if 'sample' in profilers else None
+
+    started = time.monotonic()
+    tracemalloc.start()
+    if sampler:
+        sampler.start()
+    if cprofile:
+        cprofile.start()
+    try:
+        yield
+    finally:
+        if cprofile:
+            cprofile.stop()
+        if sampler:
+            sampler.stop()
+        wall_s = time.monotonic() - started
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        try:
+            if cprofile:
+                stats = cprofile.stats()
+                stats.dump_stats(f"{base}.pstats")
+                with open(f"{base}_top.txt", 'w', encoding='utf-8') as f:
+                    stats.stream = f
+                    stats.sort_stats('cumulative').print_stats(40)
+            if sampler:
+                sampler.write(f"{base}.collapsed")
+
+            memory = _memory_report(snapshot, peak, wall_s)
+            with open(f"{base}_memory.json", 'w', encoding='utf-8') as f:
+                json.dump(memory, f, indent=2)
+
+            span = current_span()
+            if span is not None:
+                span.set(peak_traced_mb=memory['peak_traced_mb'])
+            logger.info(f"🔬 {name}: {wall_s:.1f}s, peak traced memory {memory['peak_traced_mb']} MB "
+                        f"-> {base}.*")
+        except Exception as e:
+            logger.warning(f"Could not write profile for {name}: {e}")
+        finally:
+            _active.release()
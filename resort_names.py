@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Resort Name Resolution
+Index built once from the known resorts that maps any source's spelling of a
+resort name to one canonical name: exact/alias, then normalized, then token
+set, then fuzzy. Each tier only answers when the match is unambiguous.
+"""
+
+import re
+import difflib
+from functools import lru_cache
+
+# Words that don't identify a resort ("Wolf Creek Ski Area" == "Wolf Creek")
+STOPWORDS = {'ski', 'area', 'resort', 'mountain', 'the', 'and', '&'}
+
+# Minimum difflib ratio for the fuzzy tier; high enough that "Cooper" never
+# resolves to "Copper"
+FUZZY_CUTOFF = 0.88
+
+_TOKEN_RE = re.compile(r"[a-z0-9&]+")
+
+
+def normalize_name(name):
+    """Normalize resort names for duplicate detection"""
+    name = name.lower().strip()
+    # Remove common suffixes
+    name = name.replace(' ski area', '').replace(' ski resort', '')
+    name = name.replace(' resort', '').replace(' mountain resort', '')
+    name = name.replace(' mountain', '')
+    return name
+
+
+def name_tokens(name):
+    """Identifying words of a name, ignoring case, punctuation and stopwords"""
+    return frozenset(t for t in _TOKEN_RE.findall(name.lower()) if t not in STOPWORDS)
+
+
+class ResortNameIndex:
+    """Resolves scraped resort names to canonical names in O(1) per lookup"""
+
+    def __init__(self, canonical_names, aliases=None):
+        aliases = aliases or {}
+        # A name listed as an alias is never canonical itself
+        self.canonical_names = [name for name in canonical_names if name not in aliases]
+        self._exact = {}
+        self._normalized = {}
+        self._tokens = {}
+
+        names = [(name, name) for name in self.canonical_names]
+        names += list(aliases.items())
+
+        for name, target in names:
+            self._exact[name.lower().strip()] = target
+            self._add_unique(self._normalized, normalize_name(name), target)
+            self._add_unique(self._tokens, name_tokens(name), target)
+
+        self._fuzzy_keys = sorted(k for k, v in self._normalized.items() if v is not None)
+        # Bound the cache per index instance
+        self.resolve = lru_cache(maxsize=4096)(self._resolve)
+
+    @staticmethod
+    def _add_unique(table, key, target):
+        """Add key -> target, marking keys shared by different resorts ambiguous"""
+        if not key:
+            return
+        if key in table and table[key] != target:
+            table[key] = None
+        else:
+            table[key] = target
+
+    def _resolve(self, name):
+        """Canonical name for a scraped name, or None if unknown/ambiguous"""
+        if not isinstance(name, str) or not name.strip():
+            return None
+
+        exact = self._exact.get(name.lower().strip())
+        if exact:
+            return exact
+
+        normalized = normalize_name(name)
+        if self._normalized.get(normalized):
+            return self._normalized[normalized]
+
+        tokens = name_tokens(name)
+        if self._tokens.get(tokens):
+            return self._tokens[tokens]
+
+        close = difflib.get_close_matches(normalized, self._fuzzy_keys, n=2, cutoff=FUZZY_CUTOFF)
+        if len(close) == 1:
+            return self._normalized[close[0]]
+        return None
+
+    def key(self, name):
+        """Merge key for a name: its canonical name, else its normalized form"""
+        return self.resolve(name) or normalize_name(name)
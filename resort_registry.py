@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Resort Registry
+Single source of resort metadata (coordinates, trail/lift totals, aliases)
+loaded once from resorts.csv; imports nothing from the scraping stack so the
+forecast exporter and other light consumers can use it directly
+"""
+
+import os
+import csv
+import threading
+from resort_names import ResortNameIndex
+
+REGISTRY_FILE = os.environ.get(
+    'RESORT_REGISTRY_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resorts.csv'),
+)
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+class Resort:
+    """One registry record"""
+
+    __slots__ = ('id', 'name', 'state', 'lat', 'lng', 'total_trails', 'total_lifts', 'aliases')
+
+    def __init__(self, id, name, state, lat, lng, total_trails, total_lifts, aliases=()):
+        self.id = id
+        self.name = name
+        self.state = state
+        self.lat = lat
+        self.lng = lng
+        self.total_trails = total_trails
+        self.total_lifts = total_lifts
+        self.aliases = tuple(aliases)
+
+    def as_dict(self):
+        """Legacy RESORT_DATA-style entry"""
+        return {'lat': self.lat, 'lng': self.lng,
+                'total_trails': self.total_trails, 'total_lifts': self.total_lifts}
+
+    def __repr__(self):
+        return f"Resort({self.id!r}, {self.name!r}, {self.state!r})"
+
+
+class ResortRegistry:
+    """Resorts indexed by id, name/alias and state"""
+
+    def __init__(self, resorts):
+        self.resorts = list(resorts)
+        self._by_id = {r.id: r for r in self.resorts}
+        self._by_name = {r.name: r for r in self.resorts}
+        self._by_state = {}
+        for resort in self.resorts:
+            self._by_state.setdefault(resort.state, []).append(resort)
+
+        self.aliases = {alias: r.name for r in self.resorts for alias in r.aliases}
+        # Resolves any scraped spelling to a registry name
+        self.index = ResortNameIndex(list(self._by_name), self.aliases)
+
+    @classmethod
+    def from_csv(cls, path=REGISTRY_FILE):
+        """Load the registry data file"""
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            resorts = [
+                Resort(
+                    id=row['id'],
+                    name=row['name'],
+                    state=row['state'],
+                    lat=float(row['lat']),
+                    lng=float(row['lng']),
+                    total_trails=int(row['total_trails']),
+                    total_lifts=int(row['total_lifts']),
+                    aliases=[a for a in row['aliases'].split('|') if a],
+                )
+                for row in csv.DictReader(f)
+            ]
+        return cls(resorts)
+
+    def __len__(self):
+        return len(self.resorts)
+
+    def __iter__(self):
+        return iter(self.resorts)
+
+    def by_id(self, resort_id):
+        """Record for an id, or None"""
+        return self._by_id.get(resort_id)
+
+    def lookup(self, name):
+        """Record for a scraped name (exact, alias or fuzzy), or None"""
+        canonical = self.index.resolve(name)
+        return self._by_name.get(canonical) if canonical else None
+
+    def in_state(self, state):
+        """Records for a state code, in file order"""
+        return list(self._by_state.get(state, []))
+
+    def coordinates(self, state=None):
+        """(names, latitudes, longitudes) as parallel arrays, optionally for one state"""
+        import numpy as np
+
+        resorts = self.resorts if state is None else self._by_state.get(state, [])
+        names = np.array([r.name for r in resorts], dtype=object)
+        lats = np.fromiter((r.lat for r in resorts), dtype=np.float64, count=len(resorts))
+        lngs = np.fromiter((r.lng for r in resorts), dtype=np.float64, count=len(resorts))
+        return names, lats, lngs
+
+    def as_dict(self):
+        """{name: {'lat', 'lng', 'total_trails', 'total_lifts'}} for legacy callers"""
+        return {r.name: r.as_dict() for r in self.resorts}
+
+
+def get_registry():
+    """Return the process-wide registry, loading it on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ResortRegistry.from_csv()
+    return _registry
@@ -2,22 +2,203 @@
 """
 Master Update Script for Colorado Snow Conditions
 Runs all update pipelines and logs results
+
+Each stage runs in a forked worker process that is handed the shared context
+and sends it back, so stages pass the combined DataFrame along in memory
+without re-importing or re-parsing anything, and a failed or hung stage is
+isolated and killed (with any Chrome it started) at its timeout.
+PIPELINE_MODE=subprocess runs every stage as a separate script instead.
 """
 
+import os
+import signal
 import subprocess
 import sys
+import time
 import logging
+import traceback
 from datetime import datetime
+from log_setup import forward_records, log_to_queue, setup_logging
+from profiling import profiled
+import run_report
+from run_report import span, write_report
+
+# 'worker' (default; a forked process per stage, data passed in memory) or
+# 'subprocess' (one interpreter per stage script, data passed through CSV)
+PIPELINE_MODE = os.environ.get('PIPELINE_MODE', 'worker').lower()
+
+# Per-stage timeout in seconds (10 minutes handles detailed scraping)
+STAGE_TIMEOUT = int(os.environ.get('STAGE_TIMEOUT', '600'))
+
+# Written as a run artifact (and for running google_sheets_updater.py alone)
+COMBINED_CSV = 'colorado_resorts_combined.csv'
+
+# Per-stage timings, bytes, requests and rows (see run_report.py)
+RUN_REPORT_FILE = 'run_report.json'
+
+# (process, log relay, monotonic kill time) of workers still finishing up
+# after handing back their result
+_workers = []
+
+
+def scrape_stage(context):
+    """Scrape and merge all sources; leaves the DataFrame in context"""
+    from combined_scraper import combine_resort_data, wait_for_late_scrapes
+
+    df = combine_resort_data()
+    if df.empty:
+        raise RuntimeError("No data collected")
+
+    df.to_csv(COMBINED_CSV, index=False)
+    logging.info(f"Saved combined data to {COMBINED_CSV}")
+    context['combined_df'] = df
+    # Run by the worker after handing back the frame, so the next stage
+    # doesn't wait on scrapes that missed the source deadline
+    return wait_for_late_scrapes
+
+
+def sheets_stage(context):
+    """Publish the combined data (from memory, else the last CSV) to Sheets"""
+    from google_sheets_updater import GoogleSheetsUpdater
+
+    source = context.get('combined_df')
+    if source is None:
+        if not os.path.exists(COMBINED_CSV):
+            raise FileNotFoundError(f"No combined data in memory and no {COMBINED_CSV}")
+        logging.warning(f"⚠️ No fresh combined data, publishing last {COMBINED_CSV}")
+        source = COMBINED_CSV
+
+    updater = GoogleSheetsUpdater()
+    updater.authenticate()
+    updater.update_sheet(updater.prepare_data(source))
+
+
+def _mp_context():
+    import multiprocessing
+
+    # fork hands the worker the parent's imports and any stage function;
+    # spawn (where fork is unavailable) needs module-level stage functions
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+
+
+def _stage_worker(func, context, conn, log_queue):
+    """Worker process body: run one stage and send back (status, context or error, spans)"""
+    # Own process group, so a timeout also kills the Chrome it started
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    log_to_queue(log_queue)
+    run_report.reset()
+
+    finish = None
+    try:
+        with span(func.__name__), profiled(func.__name__):
+            finish = func(context)
+        conn.send(('ok', context, run_report.build_report()['spans']))
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+        conn.send(('error', error, run_report.build_report()['spans']))
+    conn.close()
+
+    try:
+        # A stage may return a callable to run once its result is handed back
+        if callable(finish):
+            finish()
+    finally:
+        # Exit without joining threads a stage abandoned (pool workers of a
+        # scrape past its deadline); flush the log records first
+        sys.stdout.flush()
+        sys.stderr.flush()
+        log_queue.close()
+        log_queue.join_thread()
+        os._exit(0)
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("master_update.log"),
-        logging.StreamHandler()
-    ]
-)
+
+def _kill(worker):
+    """Kill a worker process and its process group (Chrome, chromedriver)"""
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(worker.pid, signal.SIGKILL)
+        except OSError:
+            pass  # the worker hadn't made its own group yet, or already exited
+    if worker.is_alive():
+        worker.kill()
+    worker.join(5)
+
+
+def _reap_workers():
+    """Wait for workers still finishing up (bounded by their stage timeout), then stop their log relays"""
+    while _workers:
+        worker, relay, kill_at = _workers.pop(0)
+        worker.join(max(0, kill_at - time.monotonic()))
+        if worker.is_alive():
+            logging.warning(f"⚠️ {worker.name} still running after its stage timeout; killing it")
+            _kill(worker)
+        relay.stop()
+
+
+def run_stage(func, description, context, timeout=STAGE_TIMEOUT):
+    """
+    Run a stage function in a worker process and return success status
+    
+    The worker gets a copy of the context and sends it back when the stage
+    succeeds, so a failed or timed-out stage can't change what later stages
+    see. A timed-out worker is killed along with its process group; one
+    that is still finishing up after sending its result (e.g. letting late
+    scrapes refresh the source cache) is reaped by main(), and killed if it
+    outlives its timeout.
+    
+    Args:
+        func: Stage function taking the shared context dict
+        description: Human-readable description for logging
+        context: Dict the stages pass results through
+        timeout: Seconds before the stage is killed
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    logging.info(f"Starting {description}...")
+    mp = _mp_context()
+    receiver, sender = mp.Pipe(duplex=False)
+    log_queue = mp.Queue()
+    relay = forward_records(log_queue)
+    worker = mp.Process(target=_stage_worker, args=(func, context, sender, log_queue),
+                        name=f"stage-{func.__name__}", daemon=True)
+    
+    with span(description):
+        started = time.monotonic()
+        worker.start()
+        sender.close()
+        timed_out = not receiver.poll(timeout)
+        result = None
+        if not timed_out:
+            try:
+                result = receiver.recv()
+            except EOFError:
+                pass  # the worker died without reporting
+        receiver.close()
+        
+        if result is None:
+            _kill(worker)
+            relay.stop()
+        else:
+            _workers.append((worker, relay, started + timeout))
+            status, payload, spans = result
+            run_report.adopt(spans)
+    
+    if timed_out:
+        logging.error(f"❌ {description} timed out (>{timeout // 60} minutes)")
+        return False
+    if result is None:
+        logging.error(f"❌ {description} failed: worker exited with code {worker.exitcode}")
+        return False
+    if status == 'error':
+        logging.error(f"❌ {description} failed with exception: {payload}")
+        return False
+    
+    context.update(payload)
+    logging.info(f"✅ {description} completed successfully")
+    return True
 
 def run_script(script_name, description):
     """
@@ -36,7 +217,7 @@ def run_script(script_name, description):
             [sys.executable, script_name],
             capture_output=True,
             text=True,
-            timeout=600  # Increased to 10 minutes to handle detailed scraping
+            timeout=STAGE_TIMEOUT
         )
         
         if result.returncode == 0:
@@ -48,7 +229,7 @@ def run_script(script_name, description):
             return False
             
     except subprocess.TimeoutExpired:
-        logging.error(f"❌ {description} timed out (>10 minutes)")
+        logging.error(f"❌ {description} timed out (>{STAGE_TIMEOUT // 60} minutes)")
         return False
     except Exception as e:
         logging.error(f"❌ {description} failed with exception: {e}")
@@ -64,17 +245,24 @@ def main():
     logging.info("🎿" * 30)
     logging.info(f"Started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Define all update scripts
+    # Define all update stages
     # Order: Scrape data → Update Google Sheets → Datawrapper reads from Sheets
-    scripts = [
-        ("combined_scraper.py", "Combined Resort Data Scraper"),
-        ("google_sheets_updater.py", "Google Sheets Update"),
+    stages = [
+        (scrape_stage, "combined_scraper.py", "Combined Resort Data Scraper"),
+        (sheets_stage, "google_sheets_updater.py", "Google Sheets Update"),
     ]
     
-    # Run each script and track results
+    # Run each stage and track results
     results = {}
-    for script, description in scripts:
-        results[description] = run_script(script, description)
+    context = {}
+    for func, script, description in stages:
+        if PIPELINE_MODE == 'subprocess':
+            with span(description):
+                results[description] = run_script(script, description)
+        else:
+            results[description] = run_stage(func, description, context)
+    
+    _reap_workers()
     
     # Calculate summary
     end_time = datetime.now()
@@ -95,6 +283,7 @@ def main():
     logging.info(f"Completed: {successful}/{total} updates successful")
     logging.info(f"Duration: {duration}")
     logging.info(f"Finished at: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    logging.info(f"Run report: {write_report(RUN_REPORT_FILE)}")
     logging.info("=" * 70)
     
     # Return exit code (0 = success, 1 = failure)
@@ -102,6 +291,7 @@ def main():
 
 
 if __name__ == "__main__":
+    setup_logging("master_update.log")
     exit_code = main()
     sys.exit(exit_code)
 
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Run Report
+Lightweight timing spans around the pipeline stages (Chrome startup, page
+fetches, detail pages, the merge, forecast rows, Sheets writes), each with
+its wall time, bytes transferred, request count and row count, written as a
+JSON report per run for the workflow artifacts
+"""
+
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+# Where entry points write their report (next to the logs by default)
+RUN_REPORT_DIR = os.environ.get('RUN_REPORT_DIR', '.')
+
+# Usage counters; these add up through enclosing spans, other fields don't
+COUNTERS = ('bytes', 'requests')
+
+# Spans kept for the report; past this (e.g. a hot function timed in a loop)
+# spans still time and count, but are only tallied as dropped
+MAX_SPANS = int(os.environ.get('RUN_REPORT_MAX_SPANS', '1000'))
+
+_current = contextvars.ContextVar('run_report_span', default=None)
+_spans = []
+# Finished span dicts reported by worker processes (see adopt())
+_adopted = []
+_dropped = 0
+_lock = threading.Lock()
+_started_at = datetime.now(timezone.utc)
+_started = time.monotonic()
+
+
+class Span:
+    """One timed stage; a dict of counters and fields plus its wall time"""
+
+    __slots__ = ('name', 'parent', 'thread', 'start_s', 'wall_s', 'status', 'error', 'values')
+
+    def __init__(self, name, parent=None, **fields):
+        self.name = name
+        self.parent = parent
+        self.thread = threading.current_thread().name
+        self.start_s = time.monotonic() - _started
+        self.wall_s = None
+        self.status = 'running'
+        self.error = None
+        self.values = dict.fromkeys(COUNTERS, 0)
+        self.values.update(fields)
+
+    def add(self, **counters):
+        """Add bytes/requests to this span and every span enclosing it"""
+        with _lock:
+            span = self
+            while span is not None:
+                for key, amount in counters.items():
+                    span.values[key] = span.values.get(key, 0) + amount
+                span = span.parent
+
+    def set(self, **fields):
+        """Record fields (e.g. rows=len(df)) on this span only"""
+        with _lock:
+            self.values.update(fields)
+
+    def as_dict(self):
+        entry = {
+            'name': self.name,
+            'parent': self.parent.name if self.parent else None,
+            'thread': self.thread,
+            'start_s': round(self.start_s, 4),
+            'wall_s': round(self.wall_s, 4) if self.wall_s is not None else None,
+            'status': self.status,
+        }
+        if self.error:
+            entry['error'] = self.error
+        entry.update(self.values)
+        return entry
+
+
+@contextmanager
+def span(name, **fields):
+    """Time a block as a child of the current span
+
+        with span('onthesnow.detail_pages') as s:
+            details = fetch()
+            s.set(rows=len(details))
+    """
+    global _dropped
+
+    current = Span(name, parent=_current.get(), **fields)
+    with _lock:
+        if len(_spans) + len(_adopted) < MAX_SPANS:
+            _spans.append(current)
+        else:
+            _dropped += 1
+    token = _current.set(current)
+    started = time.monotonic()
+    try:
+        yield current
+        current.status = 'ok'
+    except BaseException as e:
+        current.status = 'error'
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.wall_s = time.monotonic() - started
+        _current.reset(token)
+
+
+def timed(name):
+    """Decorator form of span()"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    """The innermost open span in this thread/context, or None"""
+    return _current.get()
+
+
+def add_usage(**counters):
+    """Count bytes/requests against the current span (no-op outside one)"""
+    current = _current.get()
+    if current is not None:
+        current.add(**counters)
+
+
+def in_current_span(func):
+    """Bind func to the caller's span, for work handed to another thread
+
+        executor.submit(in_current_span(self._fetch_detail), slug)
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(func, *args, **kwargs)
+
+
+def adopt(entries):
+    """Add spans a worker process reported (its build_report()['spans'])
+
+    Its top-level spans become children of the current span, whose
+    bytes/requests include theirs.
+    """
+    global _dropped
+
+    parent = _current.get()
+    entries = [dict(entry) for entry in entries]
+    top_level = [entry for entry in entries if entry['parent'] is None]
+    for entry in top_level:
+        entry['parent'] = parent.name if parent else None
+    with _lock:
+        room = max(0, MAX_SPANS - len(_spans) - len(_adopted))
+        _adopted.extend(entries[:room])
+        _dropped += len(entries) - len(entries[:room])
+    if parent is not None:
+        parent.add(**{key: sum(entry.get(key, 0) for entry in top_level) for key in COUNTERS})
+
+
+def build_report():
+    """The run so far as a JSON-serialisable dict"""
+    with _lock:
+        spans = [s.as_dict() for s in _spans] + list(_adopted)
+    top_level = [s for s in spans if s['parent'] is None]
+    return {
+        'started_at': _started_at.isoformat(timespec='seconds'),
+        'wall_s': round(time.monotonic() - _started, 4),
+        'totals': {key: sum(s.get(key, 0) for s in top_level) for key in COUNTERS},
+        'spans': spans,
+        'dropped_spans': _dropped,
+    }
+
+
+def write_report(filename, directory=None):
+    """Write the report to directory/filename and return the path"""
+    path = os.path.join(directory or RUN_REPORT_DIR, filename)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(build_report(), f, indent=2, default=str)
+    return path
+
+
+def reset():
+    """Forget all spans (tests, a worker process, or a long-lived process between runs)"""
+    global _started, _started_at, _dropped
+    # A forked worker inherits the parent's open span; start from the top
+    _current.set(None)
+    with _lock:
+        _spans.clear()
+        _adopted.clear()
+        _dropped = 0
+        _started_at = datetime.now(timezone.utc)
+        _started = time.monotonic()
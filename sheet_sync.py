@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Sheet Sync
+Cell-level diff between what a sheet holds and what an updater wants it to
+hold, so a publish only rewrites the ranges that changed (and nothing when
+the data is unchanged) instead of clearing and rewriting the whole sheet;
+sheets_client turns the diff into the publish batchUpdate
+"""
+
+import os
+
+# 'diff' writes only changed ranges; 'rewrite' is the old clear + full write
+SHEETS_SYNC_MODE = os.environ.get('SHEETS_SYNC_MODE', 'diff').lower()
+
+# Header names of per-row run timestamps: they change on every run, so they
+# are written only alongside a change to the row's data cells
+TIMESTAMP_COLUMNS = ('Last Updated', 'Last_Updated')
+
+
+def _normalize(value):
+    """Compare sheet and local values the way the sheet stores them"""
+    if value is None or value == '':
+        return ''
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return str(value)
+
+
+def diff_cells(current, desired, timestamp_columns=TIMESTAMP_COLUMNS):
+    """Rectangular blocks of cells that differ between two value grids
+
+    Returns a list of (row, start_col, values) blocks, 0-based, where values
+    is a list of rows to write at that position. Cells present in current
+    but not desired are blanked. Columns whose header (desired[0]) is in
+    timestamp_columns only count as changed when another cell in the same
+    row changed, so a new run timestamp alone writes nothing. Changed spans
+    are merged down consecutive rows when they cover the same columns (e.g.
+    a timestamp column).
+    """
+    header = desired[0] if desired else []
+    timestamps = {c for c, name in enumerate(header) if name in timestamp_columns}
+    blocks = []
+    open_blocks = {}
+
+    for r in range(max(len(current), len(desired))):
+        cur_row = current[r] if r < len(current) else []
+        des_row = desired[r] if r < len(desired) else []
+        width = max(len(cur_row), len(des_row))
+
+        changed = [
+            _normalize(cur_row[c] if c < len(cur_row) else '') != _normalize(des_row[c] if c < len(des_row) else '')
+            for c in range(width)
+        ]
+        if not any(changed[c] for c in range(width) if c not in timestamps):
+            changed = [False] * width
+
+        spans = []
+        start = None
+        for c in range(width + 1):
+            if c < width and changed[c] and start is None:
+                start = c
+            elif (c == width or not changed[c]) and start is not None:
+                spans.append((start, c))
+                start = None
+
+        still_open = {}
+        for start, end in spans:
+            values = [des_row[c] if c < len(des_row) else '' for c in range(start, end)]
+            block = open_blocks.get((start, end))
+            if block is None:
+                block = (r, start, [])
+                blocks.append(block)
+            block[2].append(values)
+            still_open[(start, end)] = block
+        open_blocks = still_open
+
+    return blocks
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Google Sheets Client
+One authenticated Sheets service per service account within a process, built
+from the bundled (static) discovery document; a publish folds clearing,
+writing and formatting into a single spreadsheets.batchUpdate round trip.
+Pipeline stages run in separate worker processes, so each updater stage
+authenticates on its own
+"""
+
+import json
+import logging
+import threading
+from run_report import add_usage, span
+from sheet_sync import SHEETS_SYNC_MODE, diff_cells
+
+logger = logging.getLogger(__name__)
+
+# Google Sheets API scopes
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def parse_credentials(credentials_json):
+    """Service account info from a dict or a (possibly quoted) JSON string"""
+    if not isinstance(credentials_json, str):
+        return credentials_json
+
+    # Clean up the JSON string (remove extra quotes, whitespace, newlines)
+    cleaned = credentials_json.strip()
+
+    # Remove surrounding quotes if present (common when pasting into GitHub secrets)
+    if cleaned.startswith("'") and cleaned.endswith("'"):
+        cleaned = cleaned[1:-1]
+    if cleaned.startswith('"') and cleaned.endswith('"'):
+        cleaned = cleaned[1:-1]
+
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse credentials JSON ({len(cleaned)} characters): {e}")
+        raise
+
+
+def _cell(value):
+    """Sheets CellData for a RAW value; '' / None clears the cell"""
+    if value is None or value == '':
+        return {}
+    if isinstance(value, bool):
+        return {'userEnteredValue': {'boolValue': value}}
+    if isinstance(value, (int, float)):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
+
+def _cell_value(cell):
+    """Stored value of a CellData read back from the sheet"""
+    value = cell.get('effectiveValue', {})
+    for key in ('numberValue', 'stringValue', 'boolValue'):
+        if key in value:
+            return value[key]
+    if 'errorValue' in value:
+        return value['errorValue'].get('message', '#ERROR')
+    return ''
+
+
+def _update_cells(sheet_id, row, col, rows):
+    return {
+        'updateCells': {
+            'start': {'sheetId': sheet_id, 'rowIndex': row, 'columnIndex': col},
+            'rows': [{'values': [_cell(v) for v in values]} for values in rows],
+            'fields': 'userEnteredValue',
+        }
+    }
+
+
+def _grow_grid(sheet_id, grid, values):
+    """appendDimension requests so values fits a (rows, columns) grid"""
+    row_count, col_count = grid
+    needed_rows = len(values)
+    needed_cols = max((len(row) for row in values), default=0)
+    requests = []
+    if needed_rows > row_count:
+        requests.append({'appendDimension': {
+            'sheetId': sheet_id, 'dimension': 'ROWS', 'length': needed_rows - row_count}})
+    if needed_cols > col_count:
+        requests.append({'appendDimension': {
+            'sheetId': sheet_id, 'dimension': 'COLUMNS', 'length': needed_cols - col_count}})
+    return requests
+
+
+class SheetsClient:
+    """Authenticated Sheets service for one service account"""
+
+    def __init__(self, credentials_info):
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build
+
+        with span('sheets.connect'):
+            self.credentials = service_account.Credentials.from_service_account_info(
+                credentials_info, scopes=SCOPES
+            )
+            # The discovery document ships with google-api-python-client, so
+            # building the service makes no HTTP request; the credentials object
+            # keeps its access token and only refreshes it once it expires
+            self.service = build('sheets', 'v4', credentials=self.credentials,
+                                 static_discovery=True, cache_discovery=False)
+
+    def read_sheet(self, spreadsheet_id, sheet_name='Sheet1'):
+        """(sheetId, grid size, values) of one tab in a single request"""
+        with span('sheets.read'):
+            result = self.service.spreadsheets().get(
+                spreadsheetId=spreadsheet_id,
+                ranges=[f'{sheet_name}!A:Z'],
+                includeGridData=True,
+                fields='sheets(properties(sheetId,gridProperties(rowCount,columnCount)),'
+                       'data(rowData(values(effectiveValue))))',
+            ).execute()
+            add_usage(bytes=len(json.dumps(result)), requests=1)
+        sheet = result['sheets'][0]
+        properties = sheet['properties']
+        grid = properties.get('gridProperties', {})
+
+        values = []
+        for data in sheet.get('data', []):
+            for row in data.get('rowData', []):
+                values.append([_cell_value(cell) for cell in row.get('values', [])])
+        # Trailing empty rows read back as {}; drop them like values.get does
+        while values and not any(v != '' for v in values[-1]):
+            values.pop()
+
+        return properties['sheetId'], (grid.get('rowCount', 0), grid.get('columnCount', 0)), values
+
+    def sheet_properties(self, spreadsheet_id, sheet_name='Sheet1'):
+        """(sheetId, grid size) of one tab, without reading its values"""
+        with span('sheets.read'):
+            result = self.service.spreadsheets().get(
+                spreadsheetId=spreadsheet_id,
+                ranges=[sheet_name],
+                includeGridData=False,
+                fields='sheets(properties(sheetId,gridProperties(rowCount,columnCount)))',
+            ).execute()
+            add_usage(bytes=len(json.dumps(result)), requests=1)
+        properties = result['sheets'][0]['properties']
+        grid = properties.get('gridProperties', {})
+        return properties['sheetId'], (grid.get('rowCount', 0), grid.get('columnCount', 0))
+
+    def publish(self, spreadsheet_id, values, sheet_name='Sheet1', format_requests=None,
+                mode=SHEETS_SYNC_MODE):
+        """Write values (and formatting) to a tab in one batchUpdate
+
+        mode 'diff' reads the tab first and writes only changed cells,
+        skipping the write entirely if nothing changed; 'rewrite' only looks
+        up the tab's sheetId and size, then clears it and writes everything.
+        Either way the grid grows to fit values. format_requests is an
+        optional callable sheet_id -> list of batchUpdate requests.
+        Returns a dict with updatedCells.
+        """
+        with span('sheets.publish', rows=len(values)) as publish_span:
+            result = self._publish(spreadsheet_id, values, sheet_name, format_requests, mode)
+            publish_span.set(cells=result['updatedCells'])
+        return result
+
+    def _publish(self, spreadsheet_id, values, sheet_name, format_requests, mode):
+        if mode == 'diff':
+            sheet_id, grid, current = self.read_sheet(spreadsheet_id, sheet_name)
+            blocks = diff_cells(current, values)
+            if not blocks:
+                logger.info("✅ Sheet already up to date, skipping write")
+                return {'updatedCells': 0}
+
+            # Grow the grid first if the data no longer fits
+            requests = _grow_grid(sheet_id, grid, values)
+            requests += [_update_cells(sheet_id, row, col, rows) for row, col, rows in blocks]
+            updated = sum(len(rows) * len(rows[0]) for _, _, rows in blocks)
+            logger.info(f"Writing {updated} changed cells in {len(blocks)} ranges...")
+        else:
+            sheet_id, grid = self.sheet_properties(spreadsheet_id, sheet_name)
+            requests = _grow_grid(sheet_id, grid, values)
+            requests.append({'updateCells': {'range': {'sheetId': sheet_id}, 'fields': 'userEnteredValue'}})
+            requests.append(_update_cells(sheet_id, 0, 0, values))
+            updated = sum(len(row) for row in values)
+            logger.info(f"Rewriting {len(values)} rows...")
+
+        if format_requests:
+            requests += format_requests(sheet_id)
+
+        body = {'requests': requests}
+        self.service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body=body,
+        ).execute()
+        add_usage(bytes=len(json.dumps(body)), requests=1)
+        return {'updatedCells': updated}
+
+
+def get_sheets_client(credentials_json):
+    """Client for a service account, created on first use in this process"""
+    info = parse_credentials(credentials_json)
+    key = info.get('client_email') if isinstance(info, dict) else None
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = SheetsClient(info)
+            _clients[key] = client
+    return client
@@ -10,19 +10,11 @@ import requests
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
+from log_setup import setup_logging
 
 # Load environment variables
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("ski_api_fetcher.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 # API Configuration
@@ -304,5 +296,6 @@ def fetch_and_save_data():
 
 
 if __name__ == "__main__":
+    setup_logging("ski_api_fetcher.log")
     fetch_and_save_data()
 
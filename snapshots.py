@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Page Snapshots
+Every live run saves the raw pages/feeds it parsed; pointing REPLAY_DIR at a
+directory of those files replays the whole pipeline offline with no network
+or Chrome, for profiling, regression tests and re-running failed runs
+"""
+
+import os
+import logging
+from log_setup import PER_ITEM
+
+logger = logging.getLogger(__name__)
+
+# Directory to replay snapshots from (unset = live run)
+REPLAY_DIR = os.environ.get('REPLAY_DIR') or None
+
+# Snapshot file names, relative to the snapshot directory
+ONTHESNOW_PAGE = 'onthesnow_page_rendered.html'
+ONTHESNOW_DETAIL = 'onthesnow_detail_{slug}.html'
+CSCUSA_PAGE = 'colorado_ski_page_rendered.html'
+ASPEN_FEED = 'aspen_feed_{mountain}.json'
+
+
+def save_snapshot(name, content, directory='.'):
+    """Write a fetched page/feed so the run can be replayed later"""
+    path = os.path.join(directory, name)
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    except OSError as e:
+        logger.warning(f"Could not save snapshot {path}: {e}")
+
+
+def load_snapshot(directory, name):
+    """Read a snapshot; raises FileNotFoundError if it wasn't captured"""
+    path = os.path.join(directory, name)
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    logger.info(f"Replaying {path} ({len(content)} bytes)", extra=PER_ITEM)
+    return content
+
+
+def has_snapshot(directory, name):
+    """True if the snapshot exists in the directory"""
+    return os.path.exists(os.path.join(directory, name))
@@ -6,32 +6,32 @@ Updates Datawrapper map with current Colorado ski resort conditions
 
 import os
 import pandas as pd
-import datawrapper
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
+from log_setup import setup_logging
 from ski_api_fetcher import SkiAPIFetcher
 
 # Load environment variables
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("snow_map.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 # API credentials
 DATAWRAPPER_API_KEY = os.environ.get("DATAWRAPPER_API_KEY")
 SNOW_MAP_CHART_ID = os.environ.get("SNOW_MAP_CHART_ID")
 
-# Initialize Datawrapper client
-dw = datawrapper.Datawrapper(access_token=DATAWRAPPER_API_KEY)
+_dw = None
+
+
+def get_datawrapper():
+    """Datawrapper client, created (and the package imported) on first use"""
+    global _dw
+    if _dw is None:
+        import datawrapper
+        _dw = datawrapper.Datawrapper(access_token=DATAWRAPPER_API_KEY)
+    return _dw
+
 
 def prepare_map_data(df):
     """
@@ -213,6 +213,7 @@ def update_snow_map():
         logger.info(f"Updating Datawrapper map {SNOW_MAP_CHART_ID}")
         
         # Upload data
+        dw = get_datawrapper()
         dw.add_data(SNOW_MAP_CHART_ID, map_data)
         logger.info(f"✅ Data uploaded: {len(map_data)} resort markers")
         
@@ -258,5 +259,6 @@ def update_snow_map():
 
 
 if __name__ == "__main__":
+    setup_logging("snow_map.log")
     update_snow_map()
 
@@ -6,32 +6,32 @@ Updates Datawrapper table with sortable Colorado ski resort data
 
 import os
 import pandas as pd
-import datawrapper
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
+from log_setup import setup_logging
 from ski_api_fetcher import SkiAPIFetcher
 
 # Load environment variables
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("snow_table.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 # API credentials
 DATAWRAPPER_API_KEY = os.environ.get("DATAWRAPPER_API_KEY")
 SNOW_TABLE_CHART_ID = os.environ.get("SNOW_TABLE_CHART_ID")
 
-# Initialize Datawrapper client
-dw = datawrapper.Datawrapper(access_token=DATAWRAPPER_API_KEY)
+_dw = None
+
+
+def get_datawrapper():
+    """Datawrapper client, created (and the package imported) on first use"""
+    global _dw
+    if _dw is None:
+        import datawrapper
+        _dw = datawrapper.Datawrapper(access_token=DATAWRAPPER_API_KEY)
+    return _dw
+
 
 def prepare_table_data(df):
     """
@@ -140,6 +140,7 @@ def update_snow_table():
         logger.info(f"Updating Datawrapper table {SNOW_TABLE_CHART_ID}")
         
         # Upload data
+        dw = get_datawrapper()
         dw.add_data(SNOW_TABLE_CHART_ID, table_data)
         logger.info(f"✅ Data uploaded: {len(table_data)} resorts")
         
@@ -185,5 +186,6 @@ def update_snow_table():
 
 
 if __name__ == "__main__":
+    setup_logging("snow_table.log")
     update_snow_table()
 
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Source Cache
+Last good DataFrame from each scraper source (OnTheSnow, CSCUSA, Aspen) kept
+on disk with a TTL; when a source fails, comes back empty or is still running
+at the publish deadline, the merge uses the cached frame, marked stale with
+its age, instead of dropping those resorts
+"""
+
+import os
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+SOURCE_CACHE_DIR = os.environ.get('SOURCE_CACHE_DIR', 'source_cache')
+
+# Oldest cached frame that may still be served, in seconds; per-source
+# overrides as SOURCE_CACHE_TTL_<SOURCE>, e.g. SOURCE_CACHE_TTL_CSCUSA=86400
+SOURCE_CACHE_TTL = int(os.environ.get('SOURCE_CACHE_TTL', str(12 * 3600)))
+
+
+def source_ttl(source):
+    """TTL in seconds for one source"""
+    return int(os.environ.get(f'SOURCE_CACHE_TTL_{source.upper()}', SOURCE_CACHE_TTL))
+
+
+def format_age(seconds):
+    """'2h 05m' / '14m' for log lines and the stale marker"""
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+class SourceCache:
+    """One JSON file per source holding its last non-empty frame"""
+
+    def __init__(self, directory=SOURCE_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, source):
+        return os.path.join(self.directory, f"{source}.json")
+
+    def get(self, source):
+        """(frame, age in seconds) of the last good result, or None if missing or past its TTL"""
+        import pandas as pd
+
+        path = self._path(source)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable source cache {path}: {e}")
+            return None
+
+        age = time.time() - entry['fetched_at']
+        if age > source_ttl(source):
+            logger.info(f"Cached {source} data is {format_age(age)} old, past its TTL")
+            return None
+        frame = entry['frame']
+        return pd.DataFrame(frame['data'], columns=frame['columns']), age
+
+    def put(self, source, df):
+        """Store a fresh non-empty result (atomically, workers may race)"""
+        if df.empty:
+            return
+        entry = {
+            'fetched_at': time.time(),
+            'frame': json.loads(df.to_json(orient='split', index=False)),
+        }
+        path = self._path(source)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save source cache {path}: {e}")
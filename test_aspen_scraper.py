@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Aspen Snowmass feed tests
+Runs scrape() against a fake session: the four feeds are fetched at once,
+share one deadline, and a failed or late feed only drops its own mountain
+"""
+
+import threading
+import time
+
+import pytest
+import requests
+
+import aspen_snowmass_scraper as aspen
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.text = '{}'
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """One canned behaviour per mountain: ok, 500, raise, slow or hang
+
+    'slow' honours the request timeout like a real socket; 'hang' ignores it.
+    """
+
+    def __init__(self, behaviours):
+        self.behaviours = behaviours
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None):
+        mountain = url.rsplit('=', 1)[1]
+        with self._lock:
+            self.calls.append((mountain, headers, timeout))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Hold every call briefly so concurrent fetches overlap
+            time.sleep(0.05)
+            behaviour = self.behaviours.get(mountain, 'ok')
+            if behaviour == 'raise':
+                raise requests.ConnectionError("boom")
+            if behaviour == 'slow':
+                time.sleep(timeout)
+                raise requests.Timeout("read timed out")
+            if behaviour == 'hang':
+                self.release.wait(5)
+                raise requests.Timeout("released after the test")
+            if behaviour == '500':
+                return FakeResponse(500)
+            return FakeResponse(200, {
+                'status': 'Open',
+                'snow24Hours': {'inches': 3},
+                'snowBase': {'inches': 40},
+                'lifts': {'openCount': 5, 'totalCount': 8},
+                'trails': {'openCount': 60, 'totalCount': 100},
+            })
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def session(monkeypatch, tmp_path):
+    # Live fetches save snapshots; keep them (even from a feed released
+    # after the test) out of the working tree
+    monkeypatch.setattr(aspen, 'save_snapshot', lambda name, content: (tmp_path / name).write_text(content))
+    session = FakeSession({})
+    session.retries = []
+
+    def get_session(retries=True):
+        session.retries.append(retries)
+        return session
+
+    monkeypatch.setattr(aspen, 'get_session', get_session)
+    yield session
+    session.release.set()
+
+
+def test_feeds_are_fetched_concurrently_as_json(session):
+    df = aspen.AspenSnowmassScraper().scrape()
+
+    assert df['name'].tolist() == ['Snowmass', 'Aspen Mountain', 'Aspen Highlands', 'Buttermilk']
+    assert df['lifts_open'].tolist() == ['5/8'] * 4
+    assert session.max_in_flight == 4
+    assert all(headers == {'Accept': 'application/json'} for _, headers, _ in session.calls)
+
+
+def test_failed_and_late_feeds_only_drop_their_mountain(session):
+    session.behaviours = {'AspenMountain': '500', 'Buttermilk': 'raise', 'AspenHighlands': 'hang'}
+
+    started = time.monotonic()
+    df = aspen.AspenSnowmassScraper(timeout=15, deadline=0.5).scrape()
+    elapsed = time.monotonic() - started
+
+    assert df['name'].tolist() == ['Snowmass']
+    # The hung feed is abandoned at the shared deadline, not its own timeout
+    assert elapsed < 2
+    assert all(timeout <= 1 for _, _, timeout in session.calls)
+
+
+def test_failed_feeds_are_retried_within_the_deadline(session, monkeypatch):
+    monkeypatch.setattr(aspen, 'FEED_RETRY_BACKOFF', 0.01)
+    session.behaviours = {'AspenMountain': '500', 'Buttermilk': 'raise'}
+
+    df = aspen.AspenSnowmassScraper(deadline=5).scrape()
+
+    assert df['name'].tolist() == ['Snowmass', 'Aspen Highlands']
+    attempts = [mountain for mountain, _, _ in session.calls]
+    assert attempts.count('AspenMountain') == attempts.count('Buttermilk') == aspen.FEED_ATTEMPTS
+    # The session's own urllib3 retries would run on past the deadline
+    assert set(session.retries) == {False}
+
+
+def test_no_feed_request_outlives_the_deadline(session):
+    session.behaviours = {'Snowmass': 'slow', 'Buttermilk': 'raise'}
+
+    aspen.AspenSnowmassScraper(timeout=15, deadline=0.5).scrape()
+
+    # Retries and backoff stop at the deadline, so the workers finish with it
+    # instead of holding interpreter exit
+    time.sleep(0.3)
+    assert not [t for t in threading.enumerate() if t.name.startswith('aspen-feed')]
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Parity test for the CSCUSA snow-card parser backends
+The lxml backend must produce exactly what the original full-page
+BeautifulSoup/html.parser path extracted from each saved page
+"""
+
+import os
+import logging
+
+import pytest
+from bs4 import BeautifulSoup
+
+from colorado_ski_scraper import HAS_LXML, ColoradoSkiScraper, StableCardCount
+
+SNAPSHOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOTS = ['colorado_ski_page_rendered.html', 'colorado_ski_page.html']
+
+
+@pytest.fixture(autouse=True)
+def _quiet_logging():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def _read(name):
+    with open(os.path.join(SNAPSHOT_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+# A closed card with no depth, surface or lift figures next to an open card
+# that has them all: nothing may leak from the second card into the first
+ADJACENT_CARDS = """
+<div class="cards">
+  <div class="one-snow-card"><div class="inner">
+    <h3 class="h5 text-left">Sunlight</h3>
+    <span class="closed-date"><span class="closed">Closed</span></span>
+    <p><span class="answer twentyfour">0"</span></p>
+  </div></div>
+  <div class="one-snow-card"><div class="inner">
+    <h3 class="h5 text-left">Arapahoe Basin</h3>
+    <span class="closed-date"><span class="open mt-3 mt-md-0">Open</span></span>
+    <p><span class="answer twentyfour">4"</span></p>
+    <p><span class="answer fortyeight">9"</span></p>
+    <p><span class="answer mid-mtn">18”</span></p>
+    <p class="surface"><span>PP</span></p>
+    <p class="lifts-open"><span class="open">5</span>/<span class="total">9</span></p>
+  </div></div>
+</div>
+"""
+
+
+def _reference_parse(html):
+    """The original parser: full html.parser tree, every card through bs4"""
+    scraper = ColoradoSkiScraper(parser_backend='bs4')
+    soup = BeautifulSoup(html, 'html.parser')
+    cards = soup.find_all('div', class_='one-snow-card')
+    return [r for r in (scraper._extract_resort_from_card(c) for c in cards) if r]
+
+
+@pytest.mark.parametrize('snapshot', SNAPSHOTS)
+@pytest.mark.parametrize('backend', ['lxml', 'bs4'])
+def test_backend_matches_reference_parser(snapshot, backend):
+    if backend == 'lxml' and not HAS_LXML:
+        pytest.skip("lxml not installed")
+
+    html = _read(snapshot)
+    expected = _reference_parse(html)
+    assert expected, f"no cards found in {snapshot}"
+
+    assert ColoradoSkiScraper(parser_backend=backend).parse_snow_data(html) == expected
+
+
+@pytest.mark.parametrize('backend', ['lxml', 'bs4'])
+def test_fields_stay_within_their_card(backend):
+    if backend == 'lxml' and not HAS_LXML:
+        pytest.skip("lxml not installed")
+
+    resorts = ColoradoSkiScraper(parser_backend=backend).parse_snow_data(ADJACENT_CARDS)
+
+    assert resorts == _reference_parse(ADJACENT_CARDS)
+    assert resorts[0] == {
+        'name': 'Sunlight', 'new_snow_24h': 0, 'new_snow_48h': 0, 'mid_mtn_depth': 0,
+        'surface_conditions': '', 'lifts_open': '0/0', 'status': 'Closed',
+    }
+    assert resorts[1]['lifts_open'] == '5/9' and resorts[1]['status'] == 'Open'
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        ColoradoSkiScraper(parser_backend='regex')
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
+
+
+def test_slowly_rendering_cards_are_not_ready_until_complete():
+    # 3 cards sit still for two 250 ms polls, then the list grows to 20
+    counts = [3, 3, 3, 8, 8, 14, 20] + [20] * 10
+
+    class FakeDriver:
+        polls = 0
+
+        def find_elements(self, by, selector):
+            count = counts[min(self.polls, len(counts) - 1)]
+            self.polls += 1
+            return [object()] * count
+
+    driver = FakeDriver()
+    ready = StableCardCount(min_cards=15, stable_for=1.0, clock=lambda: driver.polls * 0.25)
+
+    polls_to_ready = next(n for n in range(1, len(counts) + 1) if ready(driver))
+
+    assert counts[polls_to_ready - 1] == 20
+    assert polls_to_ready == 11
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Forecast exporter tests
+Runs _build_rows against a fake Open-Meteo session, no network needed
+"""
+
+import pandas as pd
+import pytest
+import requests
+
+import open_meteo_forecast_export as forecast
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Answers multi-location requests like Open-Meteo does"""
+
+    def __init__(self, fail_batches=()):
+        self.calls = []
+        self.fail_batches = set(fail_batches)
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(params)
+        if len(self.calls) - 1 in self.fail_batches:
+            raise requests.ConnectionError("boom")
+        lats = [float(v) for v in params['latitude'].split(',')]
+        payloads = [
+            {
+                'latitude': lat,
+                'daily': {
+                    'time': [f"2025-11-{12 + day}" for day in range(forecast.FORECAST_DAYS)],
+                    'snowfall_sum': [round(lat - 37, 2)] * forecast.FORECAST_DAYS,
+                },
+            }
+            for lat in lats
+        ]
+        return FakeResponse(payloads[0] if len(payloads) == 1 else payloads)
+
+
+@pytest.fixture
+def resorts_df():
+    return pd.DataFrame({
+        'name': ['A', 'B', 'C', 'D', 'E'],
+        'Latitude': [38.0, 39.0, 40.0, 41.0, 42.0],
+        'Longitude': [-106.0, -106.5, -107.0, -107.5, -108.0],
+        'State': 'CO',
+    })
+
+
+def _install(monkeypatch, session, batch_size):
+    monkeypatch.setattr(forecast, 'get_session', lambda: session)
+    monkeypatch.setattr(forecast, 'BATCH_SIZE', batch_size)
+
+
+def test_resorts_are_fetched_in_batches(monkeypatch, resorts_df):
+    session = FakeSession()
+    _install(monkeypatch, session, batch_size=2)
+
+    df = forecast._build_rows(resorts_df)
+
+    assert len(session.calls) == 3
+    assert session.calls[0]['latitude'] == '38.0000,39.0000'
+    # Open-Meteo's best match unless a model is configured
+    assert all('models' not in call for call in session.calls)
+    assert session.calls[2]['latitude'] == '42.0000'
+    # Each resort gets its own location's values back
+    assert list(df['Resort']) == ['A', 'B', 'C', 'D', 'E']
+    assert list(df['11/12/2025'].round(2)) == [round((lat - 37) / 2.54, 2) for lat in resorts_df['Latitude']]
+
+
+def test_failed_batch_only_zeroes_its_resorts(monkeypatch, resorts_df):
+    session = FakeSession(fail_batches={1})
+    _install(monkeypatch, session, batch_size=2)
+
+    df = forecast._build_rows(resorts_df)
+
+    totals = dict(zip(df['Resort'], df['Five-day total']))
+    assert totals['C'] == 0 and totals['D'] == 0
+    assert totals['A'] > 0 and totals['E'] > 0
+
+
+def test_resorts_in_one_grid_cell_share_a_fetch(monkeypatch):
+    session = FakeSession()
+    _install(monkeypatch, session, batch_size=100)
+    resorts = pd.DataFrame({
+        'name': ['Arapahoe Basin', 'Arapahoe Basin Ski Area', 'Next Door', 'Vail'],
+        'Latitude': [39.634108, 39.634108, 39.6345, 39.6061444],
+        'Longitude': [-105.87147, -105.87147, -105.8712, -106.35497],
+        'State': 'CO',
+    })
+    summary = {}
+
+    df = forecast._build_rows(resorts, summary)
+
+    assert len(session.calls[0]['latitude'].split(',')) == 2
+    assert summary == {'resorts': 4, 'cells': 2, 'deduplicated': 2}
+    assert list(df['Resort']) == list(resorts['name'])
+    assert df['Five-day total'].iloc[0] == df['Five-day total'].iloc[2]
+
+
+def test_zero_resolution_disables_dedupe():
+    lats = pd.Series([39.63, 39.63]).to_numpy()
+    first, inverse = forecast._grid_cells(lats, lats, resolution=0)
+    assert list(first) == [0, 1] and list(inverse) == [0, 1]
+
+
+def test_cache_serves_payloads_until_model_run_changes(monkeypatch, resorts_df, tmp_path):
+    from forecast_cache import ForecastCache
+
+    path = str(tmp_path / 'forecast_cache.json')
+    session = FakeSession()
+    _install(monkeypatch, session, batch_size=100)
+
+    cache = ForecastCache(path, model_run='2025-11-12T06:00Z')
+    first = forecast._build_rows(resorts_df, cache=cache)
+    cache.save()
+    assert len(session.calls) == 1
+
+    cache = ForecastCache(path, model_run='2025-11-12T06:00Z')
+    second = forecast._build_rows(resorts_df, cache=cache)
+    assert len(session.calls) == 1
+    assert cache.freshness()['cached'] == len(resorts_df)
+    assert list(second['Five-day total']) == list(first['Five-day total'])
+
+    cache = ForecastCache(path, model_run='2025-11-12T12:00Z')
+    forecast._build_rows(resorts_df, cache=cache)
+    assert len(session.calls) == 2
+
+    cache = ForecastCache(path, model_run='2025-11-12T12:00Z', force_refresh=True)
+    forecast._build_rows(resorts_df, cache=cache)
+    assert len(session.calls) == 3
+    assert cache.freshness()['fetched'] == len(resorts_df)
+
+
+def test_cache_expires_by_age_within_a_model_run(monkeypatch, resorts_df, tmp_path):
+    from forecast_cache import ForecastCache
+
+    path = str(tmp_path / 'forecast_cache.json')
+    session = FakeSession()
+    _install(monkeypatch, session, batch_size=100)
+
+    cache = ForecastCache(path, model_run='run-1')
+    forecast._build_rows(resorts_df, cache=cache)
+    for entry in cache.entries.values():
+        entry['fetched_at'] -= 7200
+    cache.save()
+
+    forecast._build_rows(resorts_df, cache=ForecastCache(path, model_run='run-1', max_age=3600))
+    assert len(session.calls) == 2
+
+
+def test_model_run_covers_every_blended_model(monkeypatch):
+    class MetaSession:
+        def __init__(self, runs):
+            self.runs = runs
+
+        def get(self, url, timeout=None):
+            if self.runs[url] is None:
+                raise requests.ConnectionError("boom")
+            return FakeResponse({'last_run_initialisation_time': self.runs[url]})
+
+    monkeypatch.setattr(forecast, 'MODEL_META_URL', 'hrrr,gfs')
+    monkeypatch.setattr(forecast, 'get_session', lambda: MetaSession({'hrrr': 1762930800, 'gfs': 1762927200}))
+    assert forecast._fetch_model_run() == '2025-11-12T07:00Z+2025-11-12T06:00Z'
+
+    # Without every model's run the cache falls back to age-based expiry
+    monkeypatch.setattr(forecast, 'get_session', lambda: MetaSession({'hrrr': None, 'gfs': 1762927200}))
+    assert forecast._fetch_model_run() is None
+
+
+def test_failed_fetches_are_not_cached(monkeypatch, resorts_df, tmp_path):
+    from forecast_cache import ForecastCache
+
+    session = FakeSession(fail_batches={0})
+    _install(monkeypatch, session, batch_size=100)
+    cache = ForecastCache(str(tmp_path / 'forecast_cache.json'), model_run='run-1')
+
+    forecast._build_rows(resorts_df, cache=cache)
+
+    assert cache.entries == {}
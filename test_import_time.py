@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Import-time regression tests
+Imports each entry point in a fresh interpreter under `python -X importtime`
+and fails if it pulls in a heavy dependency it only needs at run time. With
+RUN_BENCHMARKS=1 it also fails if the cumulative import time exceeds the
+entry point's budget (best of IMPORT_RUNS); timings are too noisy for the
+default suite
+
+    pytest test_import_time.py
+    RUN_BENCHMARKS=1 pytest test_import_time.py
+    python test_import_time.py        # print import times per entry point
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPORT_RUNS = 3
+
+# Multiply every budget, e.g. on a slow CI runner
+BUDGET_SCALE = float(os.environ.get('IMPORT_BUDGET_SCALE', '1.0'))
+
+# Check the import-time budgets as well as the forbidden imports
+RUN_BENCHMARKS = os.environ.get('RUN_BENCHMARKS', 'false').lower() in ('1', 'true', 'yes')
+
+SCRAPING_STACK = ('selenium', 'bs4', 'lxml')
+GOOGLE_STACK = ('googleapiclient', 'google.oauth2')
+
+# entry point -> (budget ms, modules that must not load at import)
+ENTRY_POINTS = {
+    'open_meteo_forecast_export': (150, SCRAPING_STACK + GOOGLE_STACK + ('pandas', 'numpy', 'requests', 'combined_scraper')),
+    'google_sheets_updater': (150, SCRAPING_STACK + GOOGLE_STACK + ('pandas',)),
+    'google_sheets_forecast_updater': (150, SCRAPING_STACK + GOOGLE_STACK + ('pandas',)),
+    'run_all_updates': (150, SCRAPING_STACK + GOOGLE_STACK + ('pandas', 'combined_scraper')),
+    'combined_scraper': (1500, SCRAPING_STACK + GOOGLE_STACK + ('onthesnow_scraper', 'colorado_ski_scraper')),
+    'snow_map': (1500, SCRAPING_STACK + GOOGLE_STACK + ('datawrapper',)),
+    'snow_table': (1500, SCRAPING_STACK + GOOGLE_STACK + ('datawrapper',)),
+}
+
+
+def import_profile(module, cwd):
+    """(cumulative ms for module, set of modules it imported) from -X importtime"""
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=cwd, env=env,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    cumulative_us = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, imported
+
+
+def best_profile(module, cwd):
+    runs = [import_profile(module, cwd) for _ in range(IMPORT_RUNS)]
+    return min(ms for ms, _ in runs), runs[0][1]
+
+
+@pytest.mark.parametrize('module', sorted(ENTRY_POINTS))
+def test_entry_point_skips_heavy_imports(module, tmp_path):
+    _, forbidden = ENTRY_POINTS[module]
+    # Run from a scratch dir so import-time log files don't land in the repo
+    _, imported = import_profile(module, str(tmp_path))
+
+    loaded = sorted(name for name in forbidden if name in imported)
+    assert not loaded, f"{module} imports {loaded} at import time; load them where they are used"
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="import-time budgets are opt-in (RUN_BENCHMARKS=1)")
+@pytest.mark.parametrize('module', sorted(ENTRY_POINTS))
+def test_entry_point_import_budget(module, tmp_path):
+    budget_ms, _ = ENTRY_POINTS[module]
+    ms, _ = best_profile(module, str(tmp_path))
+
+    limit = budget_ms * BUDGET_SCALE
+    assert ms <= limit, f"{module}: import took {ms:.0f} ms (budget {limit:.0f} ms)"
+
+
+def main():
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as cwd:
+        print(f"{'entry point':35s} {'import ms':>10s} {'budget':>8s}")
+        for module, (budget_ms, _) in ENTRY_POINTS.items():
+            ms, _ = best_profile(module, cwd)
+            print(f"{module:35s} {ms:10.1f} {budget_ms * BUDGET_SCALE:8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Logging setup tests
+Records reach the entry and per-module log files through the queue, and
+per-item lines are sampled down to a count
+"""
+
+import json
+import logging
+
+import log_setup
+from log_setup import PER_ITEM, PerItemSampler, setup_logging, shutdown_logging
+
+
+def _record(name, level=logging.INFO, per_item=True):
+    record = logging.LogRecord(name, level, __file__, 1, 'line', None, None)
+    if per_item:
+        record.per_item = True
+    return record
+
+
+def test_sampler_keeps_one_in_n_per_logger():
+    sampler = PerItemSampler(every=3)
+
+    kept = [sampler.filter(_record('onthesnow_scraper')) for _ in range(7)]
+
+    assert kept == [True, False, False, True, False, False, True]
+    assert sampler.summary() == [('onthesnow_scraper', 7, 4)]
+
+
+def test_sampler_never_drops_warnings_or_regular_lines():
+    sampler = PerItemSampler(every=0)
+
+    assert sampler.filter(_record('combined_scraper', level=logging.WARNING))
+    assert sampler.filter(_record('combined_scraper', per_item=False))
+    assert not sampler.filter(_record('combined_scraper'))
+
+
+def test_records_reach_entry_and_module_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(log_setup, 'MODULE_LOG_FILES', {'combined_scraper': 'combined_scraper.log'})
+    setup_logging('master_update.log', log_format='json', sample_every=2)
+    try:
+        logging.getLogger('combined_scraper').info("Merged sources")
+        for i in range(3):
+            logging.getLogger('combined_scraper').info(f"resort {i}", extra=PER_ITEM)
+        logging.getLogger('run_all_updates').info("Stage done")
+    finally:
+        shutdown_logging()
+
+    module_lines = [json.loads(line) for line in (tmp_path / 'combined_scraper.log').read_text().splitlines()]
+    assert [e['message'] for e in module_lines] == [
+        "Merged sources", "resort 0", "resort 2",
+        "📉 1 of 3 per-item lines sampled out (LOG_SAMPLE_EVERY=2)",
+    ]
+    assert module_lines[1]['per_item'] is True
+
+    entry_lines = (tmp_path / 'master_update.log').read_text().splitlines()
+    assert len(entry_lines) == 5
+    assert json.loads(entry_lines[-2])['logger'] == 'run_all_updates'
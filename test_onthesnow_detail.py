@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+OnTheSnow detail page parser tests
+Values come from the embedded __NEXT_DATA__ resort record, and the page text
+fills in whatever that record doesn't carry; detail fetches honour each
+scraper's per-host limit
+"""
+
+import json
+
+from onthesnow_scraper import OnTheSnowScraper, _host_semaphore
+
+
+def _detail_page(resort, text=''):
+    data = {'props': {'pageProps': {'fullResort': resort}}}
+    return (f'<html><body>{text}'
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'
+            f'</body></html>')
+
+
+def test_json_values_win_over_page_text():
+    html = _detail_page({'snow': {'middle': 127}, 'surfaceConditions': 'Powder'},
+                        text='Hard Pack <span>Mid-Mt Depth</span> <b>12"</b>')
+
+    assert OnTheSnowScraper().parse_detail_html(html) == {'surface_conditions': 'Powder', 'mid_mtn_depth': 50}
+
+
+def test_page_text_fills_in_missing_middle_depth():
+    html = _detail_page({'snow': {'base': 90}, 'surfaceConditions': 'Packed Powder'},
+                        text='<span>Mid-Mt Depth</span>\n<b>34"</b>')
+
+    assert OnTheSnowScraper().parse_detail_html(html) == {'surface_conditions': 'Packed Powder', 'mid_mtn_depth': 34}
+
+
+def test_page_without_json_uses_text():
+    html = '<html><body>Machine Groomed <div>Mid-Mt Depth</div> 41&quot;</body></html>'
+
+    assert OnTheSnowScraper().parse_detail_html(html) == {'surface_conditions': 'Machine Groomed', 'mid_mtn_depth': 41}
+
+
+if __name__ == '__main__':
+    import pytest
+    raise SystemExit(pytest.main([__file__, '-q']))
+
+
+def test_each_per_host_limit_gets_its_own_semaphore():
+    wide = _host_semaphore('www.onthesnow.com', 4)
+    narrow = _host_semaphore('www.onthesnow.com', 1)
+
+    assert narrow is not wide
+    assert narrow.acquire(blocking=False) and not narrow.acquire(blocking=False)
+    narrow.release()
+    assert _host_semaphore('www.onthesnow.com', 4) is wide
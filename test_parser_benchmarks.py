@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Parser micro-benchmarks over the committed page snapshots
+Times each parsing/enrichment stage relative to a fixed reference workload
+run alongside it (stdlib JSON decoding of the OnTheSnow payload), so the
+figures carry across machines, and fails when one gets slower than its
+recorded baseline by more than BENCHMARK_TOLERANCE (default 50%). Also checks
+that the lxml card parser stays well ahead of bs4 on the same run.
+
+Opt-in, as wall-clock timings are too noisy for the default suite:
+
+    RUN_BENCHMARKS=1 pytest test_parser_benchmarks.py
+    python test_parser_benchmarks.py               # print timings
+    python test_parser_benchmarks.py --update-baseline
+
+Only refresh the baseline in the change that intentionally moves a figure.
+"""
+
+import os
+import sys
+import json
+import logging
+import statistics
+import timeit
+
+import pytest
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parser_benchmark_baseline.json')
+SNAPSHOT_DIR = os.path.dirname(os.path.abspath(__file__))
+TOLERANCE = float(os.environ.get('BENCHMARK_TOLERANCE', '0.5'))
+REPEATS = 5
+
+RUN_BENCHMARKS = os.environ.get('RUN_BENCHMARKS', 'false').lower() in ('1', 'true', 'yes')
+
+# The lxml backend must take at most this share of the bs4 backend's time
+LXML_MAX_SHARE = 0.5
+
+# Benchmark every other one is expressed relative to
+REFERENCE = 'reference_json_loads'
+
+pytestmark = pytest.mark.skipif(not RUN_BENCHMARKS, reason="timing benchmarks are opt-in (RUN_BENCHMARKS=1)")
+
+
+def _read(name):
+    with open(os.path.join(SNAPSHOT_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _fake_forecast_payload(lat, lon):
+    """Deterministic Open-Meteo style payload so _build_rows needs no network"""
+    seed = int(abs(lat * 1000 + lon * 100)) % 7
+    return {
+        'daily': {
+            'time': [f"2025-11-{12 + day}" for day in range(5)],
+            'snowfall_sum': [round(((seed + day) % 4) * 1.7, 2) for day in range(5)],
+        }
+    }
+
+
+def _fake_forecast_batch(lats, lons):
+    return [_fake_forecast_payload(lat, lon) for lat, lon in zip(lats, lons)]
+
+
+def _benchmarks():
+    """Build {name: zero-arg callable} over the snapshots"""
+    import pandas as pd
+    from bs4 import BeautifulSoup
+    from colorado_ski_scraper import ColoradoSkiScraper
+    from onthesnow_scraper import OnTheSnowScraper, _extract_next_data, NEXT_DATA_MARKER
+    import combined_scraper
+    import open_meteo_forecast_export as forecast
+
+    cscusa_html = _read('colorado_ski_page_rendered.html')
+    ots_html = _read('onthesnow_page_rendered.html')
+    start = ots_html.find('>', ots_html.find(NEXT_DATA_MARKER)) + 1
+    ots_payload = ots_html[start:ots_html.find('</script>', start)]
+
+    cscusa = ColoradoSkiScraper()
+    cscusa_bs4 = ColoradoSkiScraper(parser_backend='bs4')
+    cards = BeautifulSoup(cscusa_html, 'html.parser').find_all('div', class_='one-snow-card')
+
+    ots = OnTheSnowScraper()
+    resort_json = [
+        item
+        for category in _extract_next_data(ots_html)['props']['pageProps']['resorts'].values()
+        for item in category.get('data', [])
+    ]
+    ots_df = pd.DataFrame(ots.parse_json_data(ots_html))
+    cscusa_df = cscusa._clean_data(pd.DataFrame(cscusa.parse_snow_data(cscusa_html)))
+
+    resorts_df = pd.DataFrame([
+        {'name': name, 'Latitude': data['lat'], 'Longitude': data['lng'], 'State': 'CO'}
+        for name, data in combined_scraper.RESORT_DATA.items()
+    ])
+
+    def build_rows():
+        original = forecast._fetch_open_meteo_batch
+        forecast._fetch_open_meteo_batch = _fake_forecast_batch
+        try:
+            forecast._build_rows(resorts_df)
+        finally:
+            forecast._fetch_open_meteo_batch = original
+
+    return {
+        REFERENCE: lambda: json.loads(ots_payload),
+        'cscusa_parse_snow_data': lambda: cscusa.parse_snow_data(cscusa_html),
+        'cscusa_parse_snow_data_bs4': lambda: cscusa_bs4.parse_snow_data(cscusa_html),
+        'cscusa_extract_resort_from_card': lambda: [cscusa._extract_resort_from_card(c) for c in cards],
+        'ots_parse_json_data': lambda: ots.parse_json_data(ots_html),
+        'ots_parse_resort_json': lambda: [ots._parse_resort_json(r) for r in resort_json],
+        'add_resort_data': lambda: combined_scraper.add_resort_data(ots_df.copy()),
+        'merge_sources': lambda: combined_scraper.merge_sources(ots_df, cscusa_df, pd.DataFrame()),
+        'build_rows': build_rows,
+    }
+
+
+def measure(func):
+    """Median seconds per call over REPEATS timing runs"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = timer.repeat(repeat=REPEATS, number=number)
+    return statistics.median(run / number for run in runs)
+
+
+def measure_relative(func):
+    """Seconds per call of func divided by the reference's, timed back to back"""
+    return measure(func) / measure(_get_benchmarks()[REFERENCE])
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, 'r') as f:
+        return json.load(f)
+
+
+_BENCHMARKS = None
+
+
+def _get_benchmarks():
+    global _BENCHMARKS
+    if _BENCHMARKS is None:
+        _BENCHMARKS = _benchmarks()
+    return _BENCHMARKS
+
+
+@pytest.fixture(autouse=True)
+def _quiet_logging():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.mark.parametrize('name', sorted(load_baseline()))
+def test_no_throughput_regression(name):
+    baseline = load_baseline()[name]
+    benchmarks = _get_benchmarks()
+    if name not in benchmarks:
+        pytest.skip(f"{name} no longer benchmarked")
+
+    relative = measure_relative(benchmarks[name])
+    limit = baseline * (1 + TOLERANCE)
+    assert relative <= limit, (
+        f"{name}: {relative:.2f}x the reference vs baseline {baseline:.2f}x (limit {limit:.2f}x)"
+    )
+
+
+def test_lxml_backend_outpaces_bs4():
+    from colorado_ski_scraper import HAS_LXML
+
+    if not HAS_LXML:
+        pytest.skip("lxml not installed")
+    benchmarks = _get_benchmarks()
+    lxml_s = measure(benchmarks['cscusa_parse_snow_data'])
+    bs4_s = measure(benchmarks['cscusa_parse_snow_data_bs4'])
+    assert lxml_s <= bs4_s * LXML_MAX_SHARE, (
+        f"lxml parse {lxml_s * 1000:.2f} ms vs bs4 {bs4_s * 1000:.2f} ms "
+        f"(limit {LXML_MAX_SHARE:.0%} of bs4)"
+    )
+
+
+def main():
+    logging.disable(logging.WARNING)
+    baseline = load_baseline()
+    results = {}
+
+    print(f"{'benchmark':35s} {'ms/call':>10s} {'relative':>10s} {'baseline':>10s} {'change':>8s}")
+    for name, func in _get_benchmarks().items():
+        if name == REFERENCE:
+            continue
+        seconds = measure(func)
+        relative = seconds / measure(_get_benchmarks()[REFERENCE])
+        results[name] = relative
+        if name in baseline:
+            change = f"{(relative / baseline[name] - 1) * 100:+.0f}%"
+            base = f"{baseline[name]:.2f}x"
+        else:
+            change, base = '', '-'
+        print(f"{name:35s} {seconds * 1000:10.2f} {relative:9.2f}x {base:>10s} {change:>8s}")
+
+    if '--update-baseline' in sys.argv:
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nSaved baseline to {BASELINE_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Profiling hook tests
+Profilers are chosen from PROFILE/--profile, and a profiled block writes
+pstats (including worker threads), collapsed stacks and a memory report
+"""
+
+import json
+import pstats
+import threading
+import time
+
+import profiling
+from profiling import profiled, requested_profilers
+
+
+def _busy_worker():
+    deadline = time.monotonic() + 0.05
+    while time.monotonic() < deadline:
+        sum(range(1000))
+
+
+def test_requested_profilers(monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE', '')
+    assert requested_profilers(['prog']) == []
+    assert requested_profilers(['prog', '--profile']) == ['cprofile', 'sample']
+    assert requested_profilers(['prog', '--profile=sample']) == ['sample']
+
+    monkeypatch.setattr(profiling, 'PROFILE', 'cprofile, bogus')
+    assert requested_profilers(['prog']) == ['cprofile']
+
+
+def test_unrequested_profile_writes_nothing(tmp_path):
+    with profiled('scrape_stage', profilers=[], directory=str(tmp_path)):
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiled_block_writes_artifacts(tmp_path):
+    with profiled('scrape_stage', profilers=['cprofile', 'sample'], directory=str(tmp_path)):
+        worker = threading.Thread(target=_busy_worker)
+        worker.start()
+        worker.join()
+
+    stats = pstats.Stats(str(tmp_path / 'scrape_stage.pstats'))
+    assert any(func[2] == '_busy_worker' for func in stats.stats)
+
+    collapsed = (tmp_path / 'scrape_stage.collapsed').read_text()
+    assert 'test_profiling:_busy_worker' in collapsed
+
+    memory = json.loads((tmp_path / 'scrape_stage_memory.json').read_text())
+    assert memory['peak_traced_mb'] >= 0
+    assert memory['top_allocations']
+
+
+def test_threads_run_under_cprofile(tmp_path, monkeypatch):
+    # The 3.12+ path (one process-wide profiler, no per-thread hook) must
+    # still let worker threads run their targets
+    for process_wide in (False, True):
+        monkeypatch.setattr(profiling, 'PROCESS_WIDE_CPROFILE', process_wide)
+        ran = []
+        with profiled('scrape_stage', profilers=['cprofile'], directory=str(tmp_path)):
+            worker = threading.Thread(target=lambda: ran.append(threading.current_thread().name))
+            worker.start()
+            worker.join()
+
+        assert len(ran) == 1
+        pstats.Stats(str(tmp_path / 'scrape_stage.pstats'))
+
+
+def test_busy_per_thread_profiler_leaves_thread_running(monkeypatch):
+    # A per-thread enable() refused by an already active profiler (what 3.12+
+    # raises) must not kill the thread before its target runs
+    class _Refusing:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    profiles = profiling._ThreadProfiles(per_thread=True)
+    monkeypatch.setattr(profiles, '_profile_class', _Refusing)
+    ran = []
+    profiles.start()
+    try:
+        worker = threading.Thread(target=lambda: ran.append(True))
+        worker.start()
+        worker.join()
+    finally:
+        profiles.stop()
+
+    assert ran == [True]
+    assert profiles.threads == []
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Offline replay regression test
+Runs the full parse/merge pipeline over the page snapshots committed in the
+repo with the network disabled, so parser or merge changes that alter the
+published data show up here
+"""
+
+import os
+import socket
+import logging
+
+import pytest
+
+import combined_scraper
+
+SNAPSHOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(autouse=True)
+def _offline(monkeypatch, tmp_path):
+    def no_network(*args, **kwargs):
+        raise AssertionError("replay run tried to use the network")
+
+    monkeypatch.setattr(socket.socket, 'connect', no_network)
+    monkeypatch.setattr(socket, 'create_connection', no_network)
+    # Nothing from a replay should land in the working tree
+    monkeypatch.chdir(tmp_path)
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def test_replay_merges_committed_snapshots(tmp_path):
+    df = combined_scraper.combine_resort_data(replay_dir=SNAPSHOT_DIR)
+
+    assert len(df) == 26
+    assert df['name'].is_unique
+    assert df['latitude'].notna().all() and df['longitude'].notna().all()
+    assert df['source'].value_counts().to_dict() == {'OnTheSnow': 22, 'CSCUSA': 4}
+
+    df = df.set_index('name')
+    breck = df.loc['Breckenridge']
+    assert (breck['status'], breck['base_depth'], breck['open_trails'], breck['total_trails'],
+            breck['open_lifts']) == ('Open', 18, 2, 188, 3)
+    assert df.loc['Vail', 'status'] == 'Closed'
+    # Aspen's four mountains come from CSCUSA when their feeds weren't captured
+    assert df.loc['Aspen Mountain', 'source'] == 'CSCUSA'
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cscusa_never_fills_onthesnow_rows():
+    import pandas as pd
+
+    _, ots = combined_scraper.scrape_onthesnow(replay_dir=SNAPSHOT_DIR)
+    _, cscusa = combined_scraper.scrape_cscusa(replay_dir=SNAPSHOT_DIR)
+
+    merged = combined_scraper.merge_sources(ots, cscusa, pd.DataFrame())
+
+    from_ots = merged[merged['source'] == 'OnTheSnow'].reset_index(drop=True)
+    expected = combined_scraper.cap_snowfall(ots, 'OnTheSnow').reset_index(drop=True)
+    pd.testing.assert_frame_equal(from_ots[expected.columns], expected, check_dtype=False)
+    # Columns only CSCUSA has stay blank on OnTheSnow rows
+    assert from_ots[merged.columns.difference(ots.columns)].isna().all().all()
+    assert len(merged) - len(from_ots) == (merged['source'] == 'CSCUSA').sum() > 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Resort name index tests
+Each resolution tier (exact/alias, normalized, token set, fuzzy), ambiguous
+names and near misses; a wrong answer here merges two resorts' data
+"""
+
+import pytest
+
+from resort_names import ResortNameIndex
+from resort_registry import get_registry
+
+CANONICAL = ['Arapahoe Basin', 'Breckenridge', 'Copper Mountain', 'Wolf Creek',
+             'Echo Mountain', 'Echo Mountain Resort']
+ALIASES = {'A-Basin': 'Arapahoe Basin', 'Wolf Creek Ski Area': 'Wolf Creek'}
+
+
+@pytest.fixture
+def index():
+    return ResortNameIndex(CANONICAL, ALIASES)
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Breckenridge', 'Breckenridge'),
+    ('  breckenridge ', 'Breckenridge'),
+    ('A-Basin', 'Arapahoe Basin'),
+    ('wolf creek ski area', 'Wolf Creek'),
+])
+def test_exact_and_alias(index, name, expected):
+    assert index.resolve(name) == expected
+
+
+def test_normalized_suffixes(index):
+    assert index.resolve('Copper Mountain Resort') == 'Copper Mountain'
+    assert index.resolve('Breckenridge Ski Resort') == 'Breckenridge'
+
+
+def test_token_set_ignores_order_and_punctuation(index):
+    assert index.resolve('Basin, Arapahoe') == 'Arapahoe Basin'
+
+
+def test_fuzzy_tier_catches_typos(index):
+    assert index.resolve('Breckenridg') == 'Breckenridge'
+
+
+def test_names_shared_by_two_resorts_are_ambiguous(index):
+    # "Echo Mountain" and "Echo Mountain Resort" both normalize to "echo"
+    assert index.resolve('Echo Ski Area') is None
+    assert index.key('Echo Ski Area') == 'echo'
+    # Their exact spellings still resolve
+    assert index.resolve('Echo Mountain Resort') == 'Echo Mountain Resort'
+
+
+def test_near_miss_below_cutoff_does_not_match():
+    index = ResortNameIndex(['Copper Mountain'])
+    assert index.resolve('Cooper') is None
+    assert index.key('Cooper') == 'cooper'
+
+
+@pytest.mark.parametrize('name', [None, '', '   ', 'Unknown Hill'])
+def test_unknown_names(index, name):
+    assert index.resolve(name) is None
+
+
+def test_registry_names_resolve_to_themselves():
+    registry = get_registry()
+    for resort in registry:
+        assert registry.index.resolve(resort.name) == resort.name
+    for alias, target in registry.aliases.items():
+        assert registry.index.resolve(alias) == target
+
+
+if __name__ == '__main__':
+    raise SystemExit(pytest.main([__file__, '-q']))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Resort registry tests
+Lookups by id/name/alias/state, coordinate arrays, and that the registry loads
+without the scraping stack
+"""
+
+import subprocess
+import sys
+
+from resort_registry import get_registry
+
+
+def test_lookup_by_id_name_and_alias():
+    registry = get_registry()
+    resort = registry.by_id('arapahoe-basin')
+    assert resort.name == 'Arapahoe Basin'
+    assert registry.lookup('Arapahoe Basin') is resort
+    assert registry.lookup('Arapahoe Basin Ski Area') is resort
+    assert registry.lookup('Unknown Hill') is None
+
+
+def test_names_are_unique_and_aliases_are_not_records():
+    registry = get_registry()
+    names = [r.name for r in registry]
+    assert len(names) == len(set(names))
+    assert not set(registry.aliases) & set(names)
+
+
+def test_coordinate_arrays_match_records():
+    registry = get_registry()
+    names, lats, lngs = registry.coordinates('CO')
+    assert len(names) == len(lats) == len(lngs) == len(registry.in_state('CO'))
+    vail = list(names).index('Vail')
+    assert lats[vail] == registry.lookup('Vail').lat
+    assert lngs[vail] == registry.lookup('Vail').lng
+    assert registry.coordinates('ZZ')[1].size == 0
+
+
+def test_registry_import_skips_scraping_stack():
+    code = (
+        "import sys, resort_registry; resort_registry.get_registry(); "
+        "print(any(m.split('.')[0] in ('selenium', 'bs4', 'combined_scraper') for m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'False'
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Pipeline runner tests
+Stages run in worker processes that share a context, a failing or hung stage
+fails alone, and a killed stage can neither change the context nor hold the
+pipeline open
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import run_all_updates
+import run_report
+from run_report import span
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_stages_share_context():
+    context = {}
+
+    def produce(ctx):
+        ctx['combined_df'] = 'frame'
+
+    def consume(ctx):
+        assert ctx['combined_df'] == 'frame'
+
+    assert run_all_updates.run_stage(produce, 'produce', context)
+    assert run_all_updates.run_stage(consume, 'consume', context)
+    assert context == {'combined_df': 'frame'}
+    run_all_updates._reap_workers()
+
+
+def test_failing_stage_is_isolated(caplog):
+    context = {}
+
+    def explode(ctx):
+        ctx['combined_df'] = 'partial'
+        raise RuntimeError("boom")
+
+    assert run_all_updates.run_stage(explode, 'explode', context) is False
+    assert context == {}
+    assert 'RuntimeError: boom' in caplog.text
+
+
+def test_hung_stage_times_out():
+    context = {}
+
+    def hang(ctx):
+        time.sleep(5)
+        ctx['combined_df'] = 'late'
+
+    started = time.monotonic()
+    assert run_all_updates.run_stage(hang, 'hang', context, timeout=0.2) is False
+    assert time.monotonic() - started < 2
+    assert context == {}
+
+
+def test_stage_logs_and_spans_reach_the_parent(caplog):
+    run_report.reset()
+
+    def fetch(ctx):
+        logging.getLogger('combined_scraper').warning("from the worker")
+        with span('request'):
+            run_report.add_usage(bytes=100, requests=1)
+
+    with caplog.at_level(logging.INFO):
+        assert run_all_updates.run_stage(fetch, 'Fetch Stage', {})
+        run_all_updates._reap_workers()
+
+    assert 'from the worker' in caplog.text
+    spans = {s['name']: s for s in run_report.build_report()['spans']}
+    assert spans['fetch']['parent'] == 'Fetch Stage'
+    assert spans['request']['parent'] == 'fetch'
+    assert spans['Fetch Stage']['bytes'] == 100
+    run_report.reset()
+
+
+def test_inner_thread_pool_cannot_hold_the_pipeline_open():
+    # A stage whose non-daemon pool workers are still busy at its timeout
+    code = (
+        "import time, run_all_updates\n"
+        "from concurrent.futures import ThreadPoolExecutor\n"
+        "def scrape(ctx):\n"
+        "    pool = ThreadPoolExecutor(max_workers=1)\n"
+        "    pool.submit(time.sleep, 5).result()\n"
+        "print(run_all_updates.run_stage(scrape, 'scrape', {}, timeout=0.2))\n"
+    )
+    started = time.monotonic()
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         cwd=REPO_DIR, timeout=30)
+    assert out.stdout.strip() == 'False', out.stderr[-2000:]
+    assert time.monotonic() - started < 3
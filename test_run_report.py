@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Run report tests
+Spans nest, usage adds up through enclosing spans (also from worker
+threads), and failures are recorded in the written report
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import run_report
+from run_report import add_usage, in_current_span, span
+
+
+@pytest.fixture(autouse=True)
+def fresh_report():
+    run_report.reset()
+    yield
+    run_report.reset()
+
+
+def _spans():
+    return {s['name']: s for s in run_report.build_report()['spans']}
+
+
+def test_usage_adds_up_through_parents_and_worker_threads():
+    def fetch(size):
+        with span('detail_page'):
+            add_usage(bytes=size, requests=1)
+
+    with span('scrape') as outer:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(in_current_span(fetch), size) for size in (100, 200, 300)]
+            for future in futures:
+                future.result()
+        outer.set(rows=3)
+
+    spans = run_report.build_report()['spans']
+    assert [s['parent'] for s in spans if s['name'] == 'detail_page'] == ['scrape'] * 3
+    scrape = _spans()['scrape']
+    assert (scrape['bytes'], scrape['requests'], scrape['rows']) == (600, 3, 3)
+    assert run_report.build_report()['totals'] == {'bytes': 600, 'requests': 3}
+
+
+def test_usage_outside_a_span_is_ignored():
+    add_usage(bytes=10, requests=1)
+    assert run_report.build_report()['spans'] == []
+
+
+def test_failed_span_is_reported(tmp_path):
+    with pytest.raises(RuntimeError):
+        with span('sheets.publish'):
+            raise RuntimeError("quota exceeded")
+
+    path = run_report.write_report('run_report.json', directory=str(tmp_path))
+
+    (entry,) = json.load(open(path))['spans']
+    assert entry['status'] == 'error'
+    assert entry['error'] == 'RuntimeError: quota exceeded'
+    assert entry['wall_s'] >= 0
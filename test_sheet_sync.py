@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Sheet sync tests
+Cell diffing and the single-batchUpdate publish against a fake Sheets service
+"""
+
+from sheet_sync import diff_cells
+from sheets_client import SheetsClient, parse_credentials
+
+
+class FakeRequest:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+def _effective(value):
+    if value == '':
+        return {}
+    if isinstance(value, (int, float)):
+        return {'effectiveValue': {'numberValue': value}}
+    return {'effectiveValue': {'stringValue': value}}
+
+
+class FakeSpreadsheets:
+    """Stands in for service.spreadsheets(), serving one tab's grid data"""
+
+    def __init__(self, sheet, sheet_id=7, row_count=1000):
+        self.sheet = sheet
+        self.sheet_id = sheet_id
+        self.row_count = row_count
+        self.gets = 0
+        self.batch_updates = []
+
+    def get(self, spreadsheetId, ranges, includeGridData, fields):
+        self.gets += 1
+        return FakeRequest({'sheets': [{
+            'properties': {'sheetId': self.sheet_id,
+                           'gridProperties': {'rowCount': self.row_count, 'columnCount': 26}},
+            'data': [{'rowData': [{'values': [_effective(v) for v in row]} for row in self.sheet]}],
+        }]})
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.batch_updates.append(body)
+        return FakeRequest({})
+
+
+class FakeService:
+    def __init__(self, sheet):
+        self._spreadsheets = FakeSpreadsheets(sheet)
+
+    def spreadsheets(self):
+        return self._spreadsheets
+
+
+def _client(sheet):
+    client = SheetsClient.__new__(SheetsClient)
+    client.service = FakeService(sheet)
+    return client, client.service._spreadsheets
+
+
+HEADER = ['Resort Name', '24h Snowfall (in)', 'Status', 'Last Updated']
+
+
+def test_identical_values_skip_the_write():
+    client, api = _client([HEADER, ['Vail', 3, 'Open', '2025-11-12 06:00']])
+
+    result = client.publish('sheet-id', [HEADER, ['Vail', 3.0, 'Open', '2025-11-12 06:00']], mode='diff')
+
+    assert result['updatedCells'] == 0
+    assert api.batch_updates == []
+
+
+def test_changed_cells_and_formatting_go_in_one_batch_update():
+    client, api = _client([
+        HEADER,
+        ['Vail', 3, 'Open', '2025-11-12 06:00'],
+        ['Loveland', 0, 'Open', '2025-11-12 06:00'],
+    ])
+    desired = [
+        HEADER,
+        ['Vail', 5.0, 'Open', '2025-11-12 12:00'],
+        ['Loveland', 2.0, 'Open', '2025-11-12 12:00'],
+    ]
+
+    result = client.publish('sheet-id', desired, mode='diff',
+                            format_requests=lambda sheet_id: [{'format': sheet_id}])
+
+    assert api.gets == 1
+    (body,) = api.batch_updates
+    updates = [r['updateCells'] for r in body['requests'] if 'updateCells' in r]
+    # Each column's changes are merged down into one rectangular block
+    assert [(u['start']['rowIndex'], u['start']['columnIndex'], len(u['rows'])) for u in updates] == [
+        (1, 1, 2), (1, 3, 2)
+    ]
+    assert updates[0]['rows'][0]['values'] == [{'userEnteredValue': {'numberValue': 5.0}}]
+    assert body['requests'][-1] == {'format': 7}
+    assert result['updatedCells'] == 4
+
+
+def test_new_timestamps_alone_skip_the_write():
+    client, api = _client([
+        HEADER,
+        ['Vail', 3, 'Open', '2025-11-12 06:00'],
+        ['Loveland', 0, 'Open', '2025-11-12 06:00'],
+    ])
+    desired = [
+        HEADER,
+        ['Vail', 3.0, 'Open', '2025-11-12 12:00'],
+        ['Loveland', 1.0, 'Open', '2025-11-12 12:00'],
+    ]
+
+    assert diff_cells(desired[:2], [HEADER, ['Vail', 3.0, 'Open', '2025-11-12 18:00']]) == []
+
+    result = client.publish('sheet-id', desired, mode='diff')
+
+    # Only Loveland's data changed, so only its row gets the new timestamp
+    (body,) = api.batch_updates
+    updates = [r['updateCells'] for r in body['requests'] if 'updateCells' in r]
+    assert [(u['start']['rowIndex'], u['start']['columnIndex'], len(u['rows'][0]['values'])) for u in updates] == [
+        (2, 1, 1), (2, 3, 1)
+    ]
+    assert result['updatedCells'] == 2
+
+
+def test_rewrite_mode_clears_and_writes_the_named_tab():
+    client, api = _client([])
+
+    client.publish('sheet-id', [HEADER, ['Vail', 3.0, 'Open', '']], sheet_name='Forecast', mode='rewrite')
+
+    # Only the tab's properties are looked up, not its values
+    assert api.gets == 1
+    (body,) = api.batch_updates
+    clear, write = body['requests']
+    assert clear['updateCells']['range'] == {'sheetId': 7}
+    assert write['updateCells']['start']['sheetId'] == 7
+    assert write['updateCells']['rows'][1]['values'][3] == {}
+
+
+def test_rewrite_mode_grows_a_short_sheet():
+    client, api = _client([])
+    api.row_count = 2
+
+    client.publish('sheet-id', [HEADER] + [['Vail', 3.0, 'Open', '']] * 4, mode='rewrite')
+
+    grow = api.batch_updates[0]['requests'][0]
+    assert grow == {'appendDimension': {'sheetId': 7, 'dimension': 'ROWS', 'length': 3}}
+
+
+def test_removed_rows_and_columns_are_blanked():
+    current = [['a', 'b', 'c'], ['1', '2', '3'], ['4', '5', '6']]
+    desired = [['a', 'b'], ['1', '2']]
+
+    blocks = diff_cells(current, desired)
+
+    assert blocks == [(0, 2, [[''], ['']]), (2, 0, [['', '', '']])]
+
+
+def test_parse_credentials_strips_secret_quoting():
+    assert parse_credentials('\'{"client_email": "x@y"}\'') == {'client_email': 'x@y'}
+    assert parse_credentials({'client_email': 'x@y'}) == {'client_email': 'x@y'}
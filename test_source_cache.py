@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Source cache tests
+A failed, empty or overdue source is merged from its last good frame,
+marked stale, and an overdue scrape still refreshes the cache
+"""
+
+import json
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import combined_scraper
+from source_cache import SourceCache
+
+
+def _ots_frame(snow):
+    return pd.DataFrame({
+        'name': ['Vail', 'Breckenridge'],
+        'status': ['Open', 'Open'],
+        'new_snow_24h': [snow, snow],
+        'base_depth': [30, 28],
+        'open_lifts': [20, 18],
+        'total_lifts': [31, 35],
+        'open_trails': [150, 120],
+        'total_trails': [276, 187],
+        'source': ['OnTheSnow', 'OnTheSnow'],
+    })
+
+
+def _empty_source(*args):
+    return ('cscusa', pd.DataFrame())
+
+
+def _empty_aspen(*args):
+    return ('aspen', pd.DataFrame())
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = SourceCache(str(tmp_path))
+    monkeypatch.setattr(combined_scraper, 'SourceCache', lambda: cache)
+    monkeypatch.setattr(combined_scraper, 'scrape_cscusa', _empty_source)
+    monkeypatch.setattr(combined_scraper, 'scrape_aspen', _empty_aspen)
+    return cache
+
+
+def test_round_trip_and_ttl(tmp_path, monkeypatch):
+    cache = SourceCache(str(tmp_path))
+    cache.put('onthesnow', _ots_frame(4))
+
+    df, age = cache.get('onthesnow')
+    assert df['new_snow_24h'].tolist() == [4, 4]
+    assert age < 5
+
+    path = tmp_path / 'onthesnow.json'
+    entry = json.loads(path.read_text())
+    entry['fetched_at'] -= 3600
+    path.write_text(json.dumps(entry))
+    monkeypatch.setenv('SOURCE_CACHE_TTL_ONTHESNOW', '1800')
+    assert cache.get('onthesnow') is None
+
+
+def test_failed_source_is_merged_from_cache(cache, monkeypatch):
+    cache.put('onthesnow', _ots_frame(6))
+
+    def scrape_onthesnow(*args):
+        raise RuntimeError("403 Forbidden")
+
+    monkeypatch.setattr(combined_scraper, 'scrape_onthesnow', scrape_onthesnow)
+
+    df = combined_scraper.combine_resort_data(replay_dir=None).set_index('name')
+
+    assert df.loc['Vail', 'new_snow_24h'] == 6
+    assert df.loc['Vail', 'source'] == 'OnTheSnow'
+    assert df.loc['Vail', 'stale_age_min'] == 0
+
+
+def test_overdue_source_uses_cache_and_refreshes_it(cache, monkeypatch):
+    cache.put('onthesnow', _ots_frame(1))
+
+    def scrape_onthesnow(*args):
+        time.sleep(0.5)
+        return ('onthesnow', _ots_frame(9))
+
+    monkeypatch.setattr(combined_scraper, 'scrape_onthesnow', scrape_onthesnow)
+    monkeypatch.setattr(combined_scraper, 'SOURCE_DEADLINE', 0.05)
+
+    df = combined_scraper.combine_resort_data(replay_dir=None).set_index('name')
+    assert df.loc['Vail', 'new_snow_24h'] == 1
+
+    deadline = time.monotonic() + 5
+    while cache.get('onthesnow')[0]['new_snow_24h'].iloc[0] != 9:
+        assert time.monotonic() < deadline, "background scrape never refreshed the cache"
+        time.sleep(0.05)
+
+
+def test_hung_source_is_abandoned_after_its_grace(cache, monkeypatch):
+    cache.put('onthesnow', _ots_frame(1))
+    release = threading.Event()
+
+    def scrape_onthesnow(*args):
+        release.wait(10)
+        return ('onthesnow', _ots_frame(9))
+
+    monkeypatch.setattr(combined_scraper, 'scrape_onthesnow', scrape_onthesnow)
+    monkeypatch.setattr(combined_scraper, 'SOURCE_DEADLINE', 0.05)
+    monkeypatch.setattr(combined_scraper, 'SOURCE_REFRESH_GRACE', 0.2)
+
+    try:
+        started = time.monotonic()
+        df = combined_scraper.combine_resort_data(replay_dir=None)
+        assert combined_scraper.wait_for_late_scrapes() is False
+        assert time.monotonic() - started < 2
+
+        # The abandoned scrape can't hold the interpreter open
+        (late,) = [t for t in threading.enumerate() if t.name == 'source-onthesnow']
+        assert late.daemon
+        assert df.set_index('name').loc['Vail', 'source'] == 'OnTheSnow'
+    finally:
+        release.set()
+
+
+def test_stale_rows_reach_the_sheet_marked_with_their_age(tmp_path):
+    from datetime import datetime, timedelta
+    from zoneinfo import ZoneInfo
+    from google_sheets_updater import GoogleSheetsUpdater
+
+    frame = pd.concat([_ots_frame(3), pd.DataFrame({'name': ['Monarch'], 'source': ['CSCUSA']})],
+                      ignore_index=True).assign(new_snow_48h=0, mid_mtn_depth=0)
+    stale = combined_scraper.mark_stale(frame, {'onthesnow': 2 * 3600 + 5 * 60})
+    path = tmp_path / 'combined.csv'
+    stale.to_csv(path, index=False)
+
+    updater = GoogleSheetsUpdater(spreadsheet_id='sheet', credentials_json='{}')
+    for source in (stale, str(path)):
+        header, *rows = updater.prepare_data(source)
+        rows = {row[0]: dict(zip(header, row)) for row in rows}
+
+        assert rows['Vail']['Data Source'] == 'OnTheSnow (cached 2h 05m ago)'
+        assert rows['Monarch']['Data Source'] == 'CSCUSA'
+
+        # Stale rows keep the time they were scraped, fresh rows are stamped now
+        now = datetime.now(ZoneInfo('America/Denver')).replace(tzinfo=None)
+        scraped = datetime.strptime(rows['Vail']['Last Updated'], '%Y-%m-%d %H:%M')
+        stamped = datetime.strptime(rows['Monarch']['Last Updated'], '%Y-%m-%d %H:%M')
+        assert abs(now - timedelta(minutes=125) - scraped) < timedelta(minutes=2)
+        assert abs(now - stamped) < timedelta(minutes=2)